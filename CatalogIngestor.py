@@ -0,0 +1,150 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from importlib.util import find_spec
+from time import perf_counter
+from typing import Any, Dict, List, Tuple
+
+from ChevroletPDFReader import ChevroletPDFReader
+from JeepPDFReader import JeepPDFReader
+from PDFParseCache import PDFParseCache
+
+# Command-line tool that parses whole directories of catalogs in parallel.
+#
+# Each PDF file is routed to a reader by its path (a file or directory name containing 'jeep' or 'chevrolet'), or
+# by the --reader option. The results are written as JSONL or Parquet:
+# - Jeep catalogs produce one row per car.
+# - Chevrolet catalogs produce one row per table cell.
+# A catalog that fails to be parsed is reported and the others are still processed.
+#
+# Usage:
+# python CatalogIngestor.py jeep_pdfs chevrolet_pdfs --output catalogs.jsonl --workers 4
+
+# Reader names.
+JEEP_READER = 'jeep'
+CHEVROLET_READER = 'chevrolet'
+READERS = [JEEP_READER, CHEVROLET_READER]
+# Output formats.
+JSONL_FORMAT = 'jsonl'
+PARQUET_FORMAT = 'parquet'
+
+
+# Function that finds the PDF files inside the given paths (files or directories, walked recursively).
+def find_pdfs(paths: List[str]) -> List[str]:
+    pdfs = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, file_names in os.walk(path):
+                pdfs += [os.path.join(directory, name) for name in sorted(file_names)
+                         if name.lower().endswith('.pdf')]
+        else:
+            pdfs.append(path)
+    return pdfs
+
+
+# Function that chooses the reader of a PDF file by its path.
+# It returns an empty string if no reader matches.
+def route_pdf(path: str) -> str:
+    lower_path = path.lower()
+    for reader in READERS:
+        if reader in lower_path:
+            return reader
+    return ''
+
+
+# Function that parses a single catalog and returns its rows.
+# It is run in the worker processes.
+def parse_catalog(path: str, reader: str, encoding: str, cache_directory: str) -> List[Dict[str, Any]]:
+    cache = PDFParseCache(cache_directory) if cache_directory != '' else None
+    rows = []
+    if reader == JEEP_READER:
+        cars = JeepPDFReader(file_path=path, cache=cache).get_cars()
+        for car_name, car_data in cars.items():
+            rows.append({'file': path, 'reader': reader, 'car': car_name, **car_data})
+    elif reader == CHEVROLET_READER:
+        tables = ChevroletPDFReader(path, encoding=encoding, parse_cache=cache).get_tables()
+        for table_group, group_tables in tables.items():
+            for table_index, table in enumerate(group_tables):
+                for line_index, line in enumerate(table.itertuples(index=False)):
+                    for column, value in zip(table.columns, line):
+                        rows.append({'file': path, 'reader': reader, 'group': table_group, 'table': table_index,
+                                     'line': line_index, 'column': column, 'value': str(value)})
+    else:
+        raise ValueError(f'No reader found for {path}, use the --reader option.')
+    return rows
+
+
+# Function that parses a catalog, measuring the time spent and catching any error.
+# It returns a tuple (rows, seconds, error), error is an empty string on success.
+def parse_catalog_safely(path: str, reader: str, encoding: str,
+                         cache_directory: str) -> Tuple[List[Dict[str, Any]], float, str]:
+    start = perf_counter()
+    try:
+        rows = parse_catalog(path, reader, encoding, cache_directory)
+    except Exception as error:
+        return [], perf_counter() - start, f'{type(error).__name__}: {error}'
+    return rows, perf_counter() - start, ''
+
+
+# Function that writes the rows to the output file.
+def write_rows(rows: List[Dict[str, Any]], output_path: str, output_format: str) -> None:
+    if output_format == PARQUET_FORMAT:
+        # Parquet output needs pandas with pyarrow (or fastparquet) installed.
+        from pandas import DataFrame
+        DataFrame(rows).astype(str).to_parquet(output_path, index=False)
+        return
+    with open(output_path, 'w', encoding='utf-8') as file:
+        for row in rows:
+            file.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+
+# Function that parses the catalogs across a process pool and writes the results.
+# It returns the number of catalogs that failed.
+def ingest(paths: List[str], output_path: str, output_format: str, workers: int = 1, reader: str = '',
+           encoding: str = 'ANSI', cache_directory: str = '') -> int:
+    pdfs = find_pdfs(paths)
+    rows: List[Dict[str, Any]] = []
+    failures = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(parse_catalog_safely, pdf, reader or route_pdf(pdf), encoding, cache_directory)
+                   for pdf in pdfs]
+        for pdf, future in zip(pdfs, futures):
+            pdf_rows, seconds, error = future.result()
+            if error != '':
+                failures += 1
+                print(f'[FAILED] {pdf} ({seconds:.2f}s): {error}')
+                continue
+            print(f'[OK] {pdf} ({seconds:.2f}s, {len(pdf_rows)} rows)')
+            rows += pdf_rows
+    write_rows(rows, output_path, output_format)
+    print(f'{len(pdfs) - failures} of {len(pdfs)} catalogs parsed, {len(rows)} rows written to {output_path}')
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Parse directories of car catalogs (PDF files).')
+    parser.add_argument('paths', nargs='+', help='PDF files or directories with PDF files.')
+    parser.add_argument('--output', '-o', required=True, help='Output file.')
+    parser.add_argument('--format', choices=[JSONL_FORMAT, PARQUET_FORMAT], default='',
+                        help='Output format (default: from the output file extension, or jsonl).')
+    parser.add_argument('--workers', '-w', type=int, default=os.cpu_count() or 1, help='Number of worker processes.')
+    parser.add_argument('--reader', choices=READERS, default='',
+                        help='Reader used for every PDF file (default: chosen by the file path).')
+    parser.add_argument('--encoding', default='ANSI', help='Encoding used by the Chevrolet reader.')
+    parser.add_argument('--cache-dir', default='', help='Directory of the on-disk parse cache (default: no cache).')
+    arguments = parser.parse_args()
+    output_format = arguments.format
+    if output_format == '':
+        output_format = PARQUET_FORMAT if arguments.output.lower().endswith('.parquet') else JSONL_FORMAT
+    # Fail before parsing anything if Parquet can't be written.
+    if output_format == PARQUET_FORMAT and find_spec('pyarrow') is None and find_spec('fastparquet') is None:
+        parser.error('Parquet output needs pyarrow or fastparquet to be installed.')
+    failures = ingest(arguments.paths, arguments.output, output_format, arguments.workers, arguments.reader,
+                      arguments.encoding, arguments.cache_dir)
+    sys.exit(1 if failures > 0 else 0)
+
+
+if __name__ == '__main__':
+    main()
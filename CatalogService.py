@@ -0,0 +1,210 @@
+import argparse
+import asyncio
+import json
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor
+from hashlib import sha256
+from multiprocessing import get_context
+from io import BytesIO
+from typing import Any, Callable, Dict, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from CatalogIngestor import JEEP_READER, READERS
+from ChevroletPDFReader import ChevroletPDFReader
+from JeepPDFReader import JeepPDFReader
+
+# Local HTTP service that parses uploaded catalogs.
+#
+# POST /parse?reader=jeep (or reader=chevrolet) with the PDF file as the request body returns the parsed catalog as
+# JSON. The readers run in a process pool, with at most 'concurrency' parses at a time. When more than 'max_pending'
+# parses are running or waiting, new uploads are rejected with 503 (backpressure) instead of piling up.
+# Concurrent uploads of byte-identical PDF files share the same parse.
+#
+# Usage:
+# python CatalogService.py --port 8080 --concurrency 2
+# curl --data-binary @jeep_pdfs/jeep.pdf 'http://127.0.0.1:8080/parse?reader=jeep'
+
+# Reason phrases of the HTTP status codes used by the service.
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 411: 'Length Required',
+            413: 'Payload Too Large', 422: 'Unprocessable Entity', 500: 'Internal Server Error',
+            503: 'Service Unavailable'}
+
+
+# Exception raised by parse_upload when a reader fails to parse the uploaded catalog.
+class ParseError(Exception):
+    pass
+
+
+# Function that parses an uploaded catalog and returns a JSON-serializable result.
+# It is run in the worker processes. Errors of the readers are raised as ParseError, so that they can be told apart
+# from failures of the workers themselves.
+def parse_upload(pdf: bytes, reader: str) -> Dict[str, Any]:
+    try:
+        if reader == JEEP_READER:
+            return {'reader': reader, 'cars': JeepPDFReader(pdf_bytes=BytesIO(pdf)).get_cars()}
+        tables = ChevroletPDFReader(BytesIO(pdf)).get_tables()
+    except Exception as error:
+        raise ParseError(f'{type(error).__name__}: {error}') from None
+    return {
+        'reader': reader,
+        'tables': {table_group: [{'columns': [str(column) for column in table.columns],
+                                  'lines': table.astype(str).values.tolist()} for table in group_tables]
+                   for table_group, group_tables in tables.items() if group_tables},
+    }
+
+
+# Exception raised to answer a request with an HTTP error.
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# This class is the catalog parsing service.
+class CatalogService:
+    # executor: Executor where the readers run.
+    # concurrency (optional): Maximum number of parses running at the same time.
+    # max_pending (optional): Maximum number of parses running or waiting. New uploads are rejected above it.
+    # max_upload_bytes (optional): Maximum size of an uploaded PDF file.
+    # executor_factory (optional): Function that creates a new executor. If given, it replaces the executor when it
+    #                              breaks (e.g. a worker process was killed), otherwise every later parse fails.
+    def __init__(self, executor: Executor, concurrency: int = 2, max_pending: int = 16,
+                 max_upload_bytes: int = 64 * 1024 * 1024, executor_factory: Callable[[], Executor] = None):
+        if concurrency < 1 or max_pending < concurrency:
+            raise ValueError('The concurrency must be at least 1, and max_pending at least the concurrency.')
+        self._executor = executor
+        self._executor_factory = executor_factory
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._max_pending = max_pending
+        self._max_upload_bytes = max_upload_bytes
+        # Parses running or waiting, keyed by the reader and the content hash of the PDF file.
+        self._in_flight: Dict[Tuple[str, str], asyncio.Future] = {}
+        # Number of uploads that shared a parse already in flight.
+        self.shared_parses = 0
+
+    # Method that parses a catalog, sharing the parse with identical uploads already in flight.
+    async def parse(self, pdf: bytes, reader: str) -> Dict[str, Any]:
+        key = (reader, sha256(pdf).hexdigest())
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.shared_parses += 1
+            return await asyncio.shield(future)
+        if len(self._in_flight) >= self._max_pending:
+            raise HTTPError(503, 'Too many catalogs being parsed, try again later.')
+        future = asyncio.ensure_future(self._run(pdf, reader))
+        self._in_flight[key] = future
+        future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Shielded, so that a client disconnecting doesn't cancel the parse shared with other clients.
+        return await asyncio.shield(future)
+
+    # Method that runs a reader in the executor, waiting for a free slot first.
+    # If the executor is broken, it is replaced (when there is an executor factory) and the request fails with 500.
+    async def _run(self, pdf: bytes, reader: str) -> Dict[str, Any]:
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            executor = self._executor
+            try:
+                return await loop.run_in_executor(executor, parse_upload, pdf, reader)
+            except BrokenExecutor:
+                self._replace_executor(executor)
+                raise HTTPError(500, 'A parser worker stopped unexpectedly, try again.')
+
+    # Method that replaces a broken executor with a new one from the executor factory.
+    # Parses that were running on the same broken executor don't replace it again.
+    def _replace_executor(self, broken_executor: Executor) -> None:
+        if self._executor_factory is None or self._executor is not broken_executor:
+            return
+        self._executor = self._executor_factory()
+        broken_executor.shutdown(wait=False)
+
+    # Method that returns the executor where the readers run (it changes when a broken executor is replaced).
+    def get_executor(self) -> Executor:
+        return self._executor
+
+    # Method that handles an HTTP connection (one request per connection).
+    async def handle_connection(self, stream_reader: asyncio.StreamReader, stream_writer: asyncio.StreamWriter) -> None:
+        try:
+            status, body = await self._handle_request(stream_reader)
+        except HTTPError as error:
+            status, body = error.status, {'error': str(error)}
+        except (asyncio.IncompleteReadError, ConnectionError):
+            stream_writer.close()
+            return
+        except ParseError as error:
+            status, body = 422, {'error': str(error)}
+        except Exception as error:
+            status, body = 500, {'error': f'{type(error).__name__}: {error}'}
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        headers = [f'HTTP/1.1 {status} {_REASONS[status]}', 'Content-Type: application/json; charset=utf-8',
+                   f'Content-Length: {len(payload)}', 'Connection: close']
+        if status == 503:
+            headers.append('Retry-After: 1')
+        stream_writer.write(('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1') + payload)
+        try:
+            await stream_writer.drain()
+        finally:
+            stream_writer.close()
+
+    # Method that reads an HTTP request and returns (status, JSON body).
+    async def _handle_request(self, stream_reader: asyncio.StreamReader) -> Tuple[int, Dict[str, Any]]:
+        request_line = (await stream_reader.readline()).decode('latin-1').split()
+        if len(request_line) != 3:
+            raise HTTPError(400, 'Malformed request line.')
+        method, target, _ = request_line
+        headers = {}
+        while True:
+            line = (await stream_reader.readline()).decode('latin-1')
+            if line in ('\r\n', '\n', ''):
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        url = urlsplit(target)
+        if url.path != '/parse':
+            raise HTTPError(404, 'Unknown path, use POST /parse?reader=jeep|chevrolet.')
+        if method != 'POST':
+            raise HTTPError(405, 'Use POST to upload a catalog.')
+        reader = parse_qs(url.query).get('reader', [''])[0]
+        if reader not in READERS:
+            raise HTTPError(400, f'The reader parameter must be one of: {", ".join(READERS)}.')
+        if 'content-length' not in headers:
+            raise HTTPError(411, 'The Content-Length header is required.')
+        try:
+            length = int(headers['content-length'])
+        except ValueError:
+            raise HTTPError(400, 'Malformed Content-Length header.')
+        if length < 0:
+            raise HTTPError(400, 'Malformed Content-Length header.')
+        if length > self._max_upload_bytes:
+            raise HTTPError(413, 'The uploaded file is too big.')
+        pdf = await stream_reader.readexactly(length)
+        return 200, await self.parse(pdf, reader)
+
+
+async def serve(host: str, port: int, concurrency: int, max_pending: int) -> None:
+    # Worker processes are spawned instead of forked, otherwise they would inherit the sockets of the connections
+    # open at the time, and closing a connection would not end it for the client.
+    def create_executor() -> Executor:
+        return ProcessPoolExecutor(max_workers=concurrency, mp_context=get_context('spawn'))
+
+    service = CatalogService(create_executor(), concurrency, max_pending, executor_factory=create_executor)
+    try:
+        server = await asyncio.start_server(service.handle_connection, host, port)
+        print(f'Listening on http://{host}:{port}/parse')
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.get_executor().shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Local HTTP service that parses uploaded car catalogs.')
+    parser.add_argument('--host', default='127.0.0.1', help='Host to listen on.')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on.')
+    parser.add_argument('--concurrency', type=int, default=2, help='Maximum number of parses at the same time.')
+    parser.add_argument('--max-pending', type=int, default=16,
+                        help='Maximum number of parses running or waiting, new uploads get 503 above it.')
+    arguments = parser.parse_args()
+    asyncio.run(serve(arguments.host, arguments.port, arguments.concurrency, arguments.max_pending))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,18 @@
 import tabula
+import tabula.io
+import pypdfium2
+import warnings
+from importlib.util import find_spec
+from re import sub
 from fuzzywuzzy import fuzz
-from pandas import DataFrame
+from pandas import DataFrame, __version__ as pandas_version
+from tabula.backend import TabulaVm
 from typing import Union, List, Dict, Tuple
 from io import BytesIO
+from time import perf_counter
+from collections import OrderedDict
+from PDFParseCache import PDFParseCache
+from ReaderMetrics import ReaderMetrics
 
 
 # This class reads a PDF file and separates the tables into groups.
@@ -26,26 +36,112 @@ class ChevroletPDFReader:
     ACCESSORIES_2_GROUP = 'Accessories 2'
     _TABLE_GROUP_NAMES = [INTRODUCTION_GROUP, CONFIGURATION_GROUP, CONFIGURATION_GROUP_2,
                           ACCESSORIES_1_GROUP, ACCESSORIES_2_GROUP, "", "", "", "", "", ""]
+    # Version of the parsed state, used by the parse cache.
+    # It must be incremented whenever the tables stored by group change.
+    CACHE_VERSION = 3
+    # Keywords used by the lazy mode to guess the section of each page, checked in this order.
+    # Each section is mapped to the groups of its successive runs of pages (e.g. the second run of 'configurações'
+    # pages is the 'Configuration 2' group). Pages without any keyword belong to the previous page's section.
+    # The guess only decides how many pages are extracted at once, the tables are always grouped like in eager mode.
+    _SECTION_KEYWORDS = [
+        ('especificações de vendas', [INTRODUCTION_GROUP]),
+        ('especificações técnicas', [SPECIFICATION_GROUP]),
+        ('acessórios', [ACCESSORIES_1_GROUP, ACCESSORIES_2_GROUP]),
+        ('configurações', [CONFIGURATION_GROUP, CONFIGURATION_GROUP_2]),
+    ]
 
-    def __init__(self, pdf_bytes: BytesIO, encoding: str = 'ANSI', fuzzy_matching_ratio_threshold: int = 75):
-        # Read all tables from the PDF file.
-        dataframes = tabula.read_pdf(
-            "carros.pdf", pages='all', lattice=True, multiple_tables=True, encoding=encoding)
+    # pdf_bytes: The PDF file bytes or the path to the PDF file.
+    # force_subprocess (optional): If True, tabula-py starts a new Java VM for this PDF file. If False (default),
+    #                              tabula-py runs in-process through JPype and the same Java VM is reused by every
+    #                              reader created in this process.
+    # cache_size (optional): Maximum number of resolved lookups kept by the get_column_value cache.
+    # parse_cache (optional): On-disk parse cache. If the same PDF file was already parsed with the same parameters,
+    #                         the tables are loaded from it and tabula-py is not called.
+    # metrics (optional): Object that records stage durations, fuzzy comparisons and tables produced.
+    #                     A new one is created if not given, see get_metrics.
+    # lazy (optional): If True, only a cheap text pass runs in the constructor, to guess which pages belong to each
+    #                  table group. The pages are extracted in order, the first time a group that needs them is
+    #                  accessed, and their tables are grouped exactly like in eager mode. Accessing the first groups
+    #                  only extracts the first pages; the 'Specification' group needs all of them.
+    def __init__(self, pdf_bytes: Union[str, BytesIO], encoding: str = 'ANSI', fuzzy_matching_ratio_threshold: int = 75,
+                 force_subprocess: bool = False, cache_size: int = 1024, parse_cache: PDFParseCache = None,
+                 metrics: ReaderMetrics = None, lazy: bool = False):
         # Set the fuzzy matching ratio threshold.
         # This is used to match column names and line names.
         self._fuzzy_matching_ratio_threshold = fuzzy_matching_ratio_threshold
+        self._metrics = metrics if metrics is not None else ReaderMetrics()
+        # Bounded LRU cache of the cells resolved by get_column_value (see _resolve_cell).
+        # It is keyed by (table_group, table_index, column_index_or_name, line_number_or_name).
+        self._cache_size = cache_size
+        self._resolved_cells: OrderedDict = OrderedDict()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        # Pages guessed for each table group, number of pages of the PDF file and number of leading pages extracted
+        # so far (only used by the lazy mode).
+        self._pages_by_group: Dict[str, List[int]] = {}
+        self._page_count = 0
+        self._pages_extracted = 0
+        # Try to load the tables from the parse cache.
+        # The pandas version is part of the key, since pickled dataframes don't load reliably across pandas versions.
+        cache_key = ''
+        if parse_cache is not None:
+            cache_key = PDFParseCache.make_key(
+                pdf_bytes, ChevroletPDFReader.__name__, ChevroletPDFReader.CACHE_VERSION,
+                {'encoding': encoding, 'fuzzy_matching_ratio_threshold': fuzzy_matching_ratio_threshold,
+                 'pandas': pandas_version})
+            cached_tables = parse_cache.get(cache_key)
+            if cached_tables is not None:
+                self._tables_by_group: Dict[str, List[DataFrame]] = cached_tables
+                self._metrics.tables += sum(len(tables) for tables in cached_tables.values())
+                self._build_lookup_indexes()
+                return
+        # In lazy mode, only guess the pages of each group. The parse cache is not filled, since the tables are
+        # extracted later and only for the groups accessed.
+        if lazy:
+            self._pdf_bytes = pdf_bytes
+            self._encoding = encoding
+            self._force_subprocess = force_subprocess
+            self._reset_tables()
+            self._build_lookup_indexes()
+            with self._metrics.stage('page_index'):
+                self._build_page_index(pdf_bytes)
+            return
+        # Read all tables from the PDF file.
+        with self._metrics.stage('extraction'):
+            dataframes = tabula.read_pdf(
+                pdf_bytes, pages='all', lattice=True, multiple_tables=True, encoding=encoding,
+                force_subprocess=force_subprocess)
         # Call the initial setup method.
-        self._initial_setup(dataframes)
+        with self._metrics.stage('initial_setup'):
+            self._initial_setup(dataframes)
+        self._metrics.tables += sum(len(tables) for tables in self._tables_by_group.values())
+        if parse_cache is not None:
+            parse_cache.put(cache_key, self._tables_by_group)
 
     # This method separates the tables into groups and sanitizes the dataframes.
     def _initial_setup(self, dataframes: List[DataFrame]) -> None:
+        self._reset_tables()
+        self._add_tables(dataframes)
+        # Build the lookup indexes used by get_column_value.
+        self._build_lookup_indexes()
+
+    # This method empties the map of tables by group, and the cache of resolved cells, since their positions refer to
+    # the previous tables.
+    def _reset_tables(self) -> None:
+        self._clear_cell_cache()
         # Map of tables by group.
         self._tables_by_group: Dict[str, List[DataFrame]] = {}
         for table_group in self._TABLE_GROUP_NAMES:
             self._tables_by_group[table_group] = []
         self._tables_by_group[ChevroletPDFReader.SPECIFICATION_GROUP] = []
         # Variable to keep track of the current table group.
-        current_table_group_index = 0
+        self._current_table_group_index = 0
+
+    # This method sanitizes the dataframes and adds them to their groups, in order.
+    # It can be called many times with consecutive dataframes (as the lazy mode does), the result is the same as
+    # calling it once with all of them.
+    def _add_tables(self, dataframes: List[DataFrame]) -> None:
+        current_table_group_index = self._current_table_group_index
         # Removing new lines from column names and removing unnamed columns.
         # Also removing empty dataframes.
         for dataframe in dataframes:
@@ -53,27 +149,13 @@ class ChevroletPDFReader:
             # Don't consider empty tables.
             if dataframe.empty:
                 continue
-            for column in dataframe.columns:
-                # Transform all column data to string to avoid errors found.
-                dataframe[column] = dataframe[column].astype(str)
-                # Remove new lines from column names.
-                dataframe.rename(
-                    columns={column: column.replace('\r', ' ')}, inplace=True)
-                # Remove unnamed columns.
-                if 'unnamed' in str.lower(column):
-                    del dataframe[column]
+            dataframe = self._sanitize_table(dataframe)
             # Don't consider tables with only one column.
             if len(dataframe.columns) <= 1:
                 # Check if it is a technical specifications table.
                 # (this table is weird and must be handled separately).
-                # Get the only column name.
-                column_name = dataframe.columns[0]
-                # Check if the column name is similar to "Especificações Técnicas".
-                ratio = fuzz.ratio(str.lower(column_name), 'especificações técnicas')
-                if ratio < 50:
-                    continue
-                # If it is, then it is a technical specifications table.
-                self._tables_by_group[ChevroletPDFReader.SPECIFICATION_GROUP].append(dataframe)
+                if self._is_specification_table(dataframe):
+                    self._tables_by_group[ChevroletPDFReader.SPECIFICATION_GROUP].append(dataframe)
                 continue
             # Is the current table of the same group as the previous one?
             # Or is it a completely new group?
@@ -99,6 +181,119 @@ class ChevroletPDFReader:
                 # Append the table to the current table group.
                 table_group = self._TABLE_GROUP_NAMES[current_table_group_index]
                 self._tables_by_group[table_group].append(dataframe)
+        self._current_table_group_index = current_table_group_index
+
+    # This method sanitizes a table extracted by tabula-py:
+    # - Unnamed columns are removed (a single column selection).
+    # - New lines are removed from column names (a single header assignment).
+    # - Empty cells (NaN) are replaced by empty strings, since astype(str) keeps them as NaN on recent pandas versions.
+    # - All column data is transformed to string to avoid errors found, and stored as categoricals, since option and
+    #   trim names repeat a lot.
+    # The cells are converted one column at a time, so the intermediate copies are never bigger than a column.
+    @staticmethod
+    def _sanitize_table(dataframe: DataFrame) -> DataFrame:
+        named_columns = [not ('unnamed' in str.lower(column)) for column in dataframe.columns]
+        dataframe = dataframe.loc[:, named_columns]
+        dataframe.columns = [column.replace('\r', ' ') for column in dataframe.columns]
+        columns = {}
+        for position, (_, column) in enumerate(dataframe.items()):
+            columns[position] = column.where(column.notna(), '').astype(str).astype('category')
+        sanitized = DataFrame(columns, index=dataframe.index)
+        sanitized.columns = dataframe.columns
+        return sanitized
+
+    # This method checks if a table with a single column is a technical specifications table.
+    def _is_specification_table(self, dataframe: DataFrame) -> bool:
+        # Get the only column name.
+        column_name = dataframe.columns[0]
+        # Check if the column name is similar to "Especificações Técnicas".
+        self._metrics.fuzzy_comparisons += 1
+        ratio = fuzz.ratio(str.lower(column_name), 'especificações técnicas')
+        return ratio >= 50
+
+    # This method normalizes (lowercases) the column names and the cells of every table once, so that lookups don't
+    # have to do it again on every call.
+    # For each table group, there is a list with one entry per table: (normalized column names, normalized cells of
+    # each column).
+    def _build_lookup_indexes(self) -> None:
+        self._lookup_indexes_by_group: Dict[str, List[Tuple[List[str], List[List[str]]]]] = {}
+        for table_group in self._tables_by_group:
+            self._build_group_lookup_index(table_group)
+
+    # This method builds the lookup index of a single table group (see _build_lookup_indexes).
+    def _build_group_lookup_index(self, table_group: str) -> None:
+        self._lookup_indexes_by_group[table_group] = []
+        for table in self._tables_by_group[table_group]:
+            columns = [str.lower(str(name)) for name in table.columns]
+            cells = [[str.lower(value) for value in table.iloc[:, index]] for index in range(len(table.columns))]
+            self._lookup_indexes_by_group[table_group].append((columns, cells))
+
+    # This method guesses the pages of each table group, used by the lazy mode.
+    # It only reads the raw text of the pages (with pdfium, which is much faster than extracting tables), and looks
+    # for the keywords of each section (see _SECTION_KEYWORDS).
+    def _build_page_index(self, pdf_bytes: Union[str, BytesIO]) -> None:
+        runs_by_section: Dict[str, int] = {}
+        previous_section = ''
+        table_group = ''
+        document = pypdfium2.PdfDocument(pdf_bytes)
+        try:
+            self._page_count = len(document)
+            for page_index in range(len(document)):
+                page = document[page_index]
+                text_page = page.get_textpage()
+                text = sub(r'\s+', ' ', str.lower(text_page.get_text_range()))
+                text_page.close()
+                page.close()
+                section = next((keyword for keyword, _ in self._SECTION_KEYWORDS if keyword in text), previous_section)
+                if section == '':
+                    continue
+                # A new run of pages of this section.
+                if section != previous_section:
+                    runs_by_section[section] = runs_by_section.get(section, 0) + 1
+                    groups = dict(self._SECTION_KEYWORDS)[section]
+                    table_group = groups[min(runs_by_section[section], len(groups)) - 1]
+                previous_section = section
+                # tabula-py page numbers start at 1.
+                self._pages_by_group.setdefault(table_group, []).append(page_index + 1)
+        finally:
+            document.close()
+
+    # This method checks if all the tables of a group were extracted (always True outside the lazy mode).
+    # A group is complete once a table of a later group was found, or once all the pages were extracted. The
+    # 'Specification' group and the groups without a name can have tables anywhere, so they need all the pages.
+    def _is_group_complete(self, table_group: str) -> bool:
+        if self._pages_extracted >= self._page_count:
+            return True
+        if table_group == ChevroletPDFReader.SPECIFICATION_GROUP or table_group == '':
+            return False
+        return self._current_table_group_index > self._TABLE_GROUP_NAMES.index(table_group)
+
+    # This method extracts the next pages of the PDF file, in lazy mode, until all the tables of a group are extracted.
+    # The pages are always extracted in order, and their tables grouped like in eager mode (see _add_tables), so the
+    # tables of a group don't depend on the groups accessed before. Each call to tabula-py extracts the pages up to
+    # the last page guessed for the group (see _build_page_index), then one page at a time if the guess was short.
+    def _load_group(self, table_group: str) -> None:
+        if self._is_group_complete(table_group):
+            return
+        guessed_pages = self._pages_by_group.get(table_group, [])
+        tables_before = sum(len(tables) for tables in self._tables_by_group.values())
+        while not self._is_group_complete(table_group):
+            first_page = self._pages_extracted + 1
+            last_page = max(guessed_pages + [first_page])
+            if table_group == ChevroletPDFReader.SPECIFICATION_GROUP or table_group == '':
+                last_page = self._page_count
+            with self._metrics.stage('extraction'):
+                if isinstance(self._pdf_bytes, BytesIO):
+                    self._pdf_bytes.seek(0)
+                dataframes = tabula.read_pdf(
+                    self._pdf_bytes, pages=list(range(first_page, last_page + 1)), lattice=True,
+                    multiple_tables=True, encoding=self._encoding, force_subprocess=self._force_subprocess)
+            self._pages_extracted = last_page
+            with self._metrics.stage('initial_setup'):
+                self._add_tables(dataframes)
+        with self._metrics.stage('initial_setup'):
+            self._build_lookup_indexes()
+        self._metrics.tables += sum(len(tables) for tables in self._tables_by_group.values()) - tables_before
 
     # This is a very complex method, which will be explained below:
     #
@@ -127,58 +322,165 @@ class ChevroletPDFReader:
         # Return empty string if the table group doesn't exist.
         if table_group not in self._tables_by_group:
             return ''
+        # In lazy mode, extract the tables of the group on first access.
+        self._load_group(table_group)
         # Return empty string if the table index is out of range.
         if table_index >= len(self._tables_by_group[table_group]):
             return ''
+        # Return empty string if the parameters are not of the expected types.
+        if not isinstance(column_index_or_name, (int, str)) or not isinstance(line_number_or_name, (int, Tuple)):
+            return ''
+        # Resolve the (line, column) position of the cell. The result is cached.
+        cell = self._resolve_cell(table_group, table_index, column_index_or_name, line_number_or_name)
+        if cell is None:
+            return ''
         table = self._tables_by_group[table_group][table_index]
-        # Which column to use?
-        # Should we use the column name or the column index?
-        # It depends on the type of the column_index_or_name parameter (int or str).
-        column_index = 0
-        # If using column name...
+        return table.iloc[cell[0], cell[1]]
+
+    # This method resolves the parameters of get_column_value into a (line_index, column_index) position, using the
+    # bounded LRU cache of resolved cells. It returns None if the line could not be found.
+    # The cache is a plain dictionary of the instance (not functools.lru_cache around a bound method, which would keep
+    # the reader in a reference cycle), so the tables are freed as soon as the reader is no longer used.
+    def _resolve_cell(self, table_group: str, table_index: int, column_index_or_name: Union[int, str],
+                      line_number_or_name: Union[int, Tuple[int, str]]) -> Union[Tuple[int, int], None]:
+        key = (table_group, table_index, column_index_or_name, line_number_or_name)
+        if key in self._resolved_cells:
+            self._cache_hits += 1
+            self._resolved_cells.move_to_end(key)
+            return self._resolved_cells[key]
+        self._cache_misses += 1
+        cell = self._resolve_cell_uncached(table_group, table_index, column_index_or_name, line_number_or_name)
+        if self._cache_size > 0:
+            self._resolved_cells[key] = cell
+            if len(self._resolved_cells) > self._cache_size:
+                self._resolved_cells.popitem(last=False)
+        return cell
+
+    # This method empties the cache of resolved cells (the hit and miss counters are kept).
+    def _clear_cell_cache(self) -> None:
+        self._resolved_cells.clear()
+
+    # This method resolves the parameters of get_column_value into a (line_index, column_index) position.
+    # It returns None if the line could not be found.
+    def _resolve_cell_uncached(self, table_group: str, table_index: int, column_index_or_name: Union[int, str],
+                               line_number_or_name: Union[int, Tuple[int, str]]) -> Union[Tuple[int, int], None]:
+        line_index = self._resolve_line(table_group, table_index, line_number_or_name)
+        if line_index is None:
+            return None
+        return line_index, self._resolve_column(table_group, table_index, column_index_or_name)
+
+    # This method resolves a column index or a column name into a column index.
+    # Column names are matched using fuzzywuzzy. If no column name is similar enough, the first column is used.
+    def _resolve_column(self, table_group: str, table_index: int, column_index_or_name: Union[int, str]) -> int:
         if isinstance(column_index_or_name, str):
-            # Using fuzzywuzzy to find the most similar column name.
-            most_similar_column_index = 0
-            most_similar_column_ratio = 0
-            for index, name in enumerate(table.columns):
-                ratio = fuzz.ratio(
-                    str.lower(name), str.lower(column_index_or_name))
-                if ratio >= self._fuzzy_matching_ratio_threshold and ratio > most_similar_column_ratio:
-                    most_similar_column_index = index
-                    most_similar_column_ratio = ratio
-            column_index = most_similar_column_index
-        # If using column index...
-        elif isinstance(column_index_or_name, int):
-            column_index = column_index_or_name
-        else:
-            return ''
-        # Ok, now we have the column index.
-        # Now, should we use the line number or a tuple (column_number, line_name)?
-        # It depends on the type of the line_number_or_name parameter (int or Tuple[int, str]).
-        # If using line number...
+            columns = self._lookup_indexes_by_group[table_group][table_index][0]
+            column_index, _ = self._find_most_similar(columns, column_index_or_name)
+            return column_index
+        return column_index_or_name
+
+    # This method resolves a line number or a tuple (column_number, line_name) into a line index.
+    # Line names are matched using fuzzywuzzy. It returns None if the line could not be found.
+    def _resolve_line(self, table_group: str, table_index: int,
+                      line_number_or_name: Union[int, Tuple[int, str]]) -> Union[int, None]:
         if isinstance(line_number_or_name, int):
-            if line_number_or_name >= len(table):
-                return ''
-            return table.iloc[line_number_or_name, column_index]
-        # If using tuple (column_number, line_name)...
-        elif isinstance(line_number_or_name, Tuple):
-            # Using fuzzywuzzy to find the most similar line name.
-            most_similar_line_index = 0
-            most_similar_line_ratio = 0
-            column_number = line_number_or_name[0]
-            line_name = line_number_or_name[1]
-            for index, name in enumerate(table.iloc[:, column_number]):
-                ratio = fuzz.ratio(str.lower(name), str.lower(line_name))
-                if ratio >= self._fuzzy_matching_ratio_threshold and ratio > most_similar_line_ratio:
-                    most_similar_line_index = index
-                    most_similar_line_ratio = ratio
-            if most_similar_line_ratio == 0:
-                return ''
-            return table.iloc[most_similar_line_index, column_index]
-        else:
-            return ''
+            if line_number_or_name >= len(self._tables_by_group[table_group][table_index]):
+                return None
+            return line_number_or_name
+        cells = self._lookup_indexes_by_group[table_group][table_index][1]
+        column_number = line_number_or_name[0]
+        line_name = line_number_or_name[1]
+        line_index, line_ratio = self._find_most_similar(cells[column_number], line_name)
+        if line_ratio == 0:
+            return None
+        return line_index
+
+    # This method finds the most similar name to the query in a list of normalized (lowercase) names.
+    # It returns a tuple (index, ratio). If no name is similar enough, it returns (0, 0).
+    # Exact matches are found without fuzzy matching, since they always have the highest possible ratio.
+    def _find_most_similar(self, names: List[str], query: str) -> Tuple[int, int]:
+        query = str.lower(query)
+        if query != '' and self._fuzzy_matching_ratio_threshold <= 100 and query in names:
+            return names.index(query), 100
+        most_similar_index = 0
+        most_similar_ratio = 0
+        self._metrics.fuzzy_comparisons += len(names)
+        for index, name in enumerate(names):
+            ratio = fuzz.ratio(name, query)
+            if ratio >= self._fuzzy_matching_ratio_threshold and ratio > most_similar_ratio:
+                most_similar_index = index
+                most_similar_ratio = ratio
+        return most_similar_index, most_similar_ratio
+
+    # This method returns the hit and miss counters of the get_column_value cache.
+    def get_cache_info(self) -> Dict[str, int]:
+        return {'hits': self._cache_hits, 'misses': self._cache_misses, 'size': len(self._resolved_cells),
+                'max_size': self._cache_size}
+
+    # This method returns many cells of a table at once, as a sub-grid.
+    #
+    # It works like get_column_value, but receives a list of columns and a list of lines:
+    #
+    # columns_indexes_or_names: List[int OR str] => The column indexes or column names.
+    # lines_numbers_or_names: List[int OR Tuple[int, str]] => The line numbers or tuples (column_number, line_name).
+    #
+    # Each column and each line is resolved only once, and the cells are copied with a single iloc slice.
+    # The returned dataframe has one line per line query and one column per column query, labeled by the queries
+    # (line names are used as labels for tuples). Lines that could not be found, and columns or lines that are not of
+    # the expected types, are filled with empty strings. An empty dataframe is returned if the table doesn't exist.
+    #
+    # Example: build a trim-by-option availability matrix of the first configuration table.
+    # reader.get_column_values(ChevroletPDFReader.CONFIGURATION_GROUP, 0, ['LT Turbo 116cv', 'Premier 116cv'],
+    #                          [(0, 'Brake Light'), (0, 'Airbag')])
+    def get_column_values(self, table_group: str, table_index: int,
+                          columns_indexes_or_names: List[Union[int, str]],
+                          lines_numbers_or_names: List[Union[int, Tuple[int, str]]]) -> DataFrame:
+        # Return empty dataframe if the table group doesn't exist.
+        if table_group not in self._tables_by_group:
+            return DataFrame()
+        # In lazy mode, extract the tables of the group on first access.
+        self._load_group(table_group)
+        # Return empty dataframe if the table index is out of range.
+        if table_index >= len(self._tables_by_group[table_group]):
+            return DataFrame()
+        table = self._tables_by_group[table_group][table_index]
+        # Resolve each axis once. Queries that are not of the expected types (as in get_column_value) and lines that
+        # could not be found are left as empty strings.
+        column_indexes = [self._resolve_column(table_group, table_index, column)
+                          if isinstance(column, (int, str)) else None for column in columns_indexes_or_names]
+        line_indexes = [self._resolve_line(table_group, table_index, line)
+                        if isinstance(line, (int, Tuple)) else None for line in lines_numbers_or_names]
+        found_columns = [index for index, column_index in enumerate(column_indexes) if column_index is not None]
+        found_lines = [index for index, line_index in enumerate(line_indexes) if line_index is not None]
+        sub_grid = DataFrame('', index=range(len(line_indexes)), columns=range(len(column_indexes)), dtype=object)
+        if found_columns and found_lines:
+            # Copy all the found cells with a single slice.
+            values = table.iloc[[line_indexes[index] for index in found_lines],
+                                [column_indexes[index] for index in found_columns]].to_numpy()
+            sub_grid.iloc[found_lines, found_columns] = values
+        line_labels = [line[1] if isinstance(line, Tuple) else line for line in lines_numbers_or_names]
+        sub_grid.index = line_labels
+        sub_grid.columns = list(columns_indexes_or_names)
+        return sub_grid
+
+    # This method returns the metrics recorded while parsing the PDF file and looking up values.
+    def get_metrics(self) -> ReaderMetrics:
+        return self._metrics
+
+    # This method extracts the tables of every group not extracted yet (only does something in lazy mode).
+    def _load_all_groups(self) -> None:
+        self._load_group(ChevroletPDFReader.SPECIFICATION_GROUP)
+
+    # This method returns the tables of every table group.
+    # It returns a copy of the dictionary (and of its lists), so that the original dictionary is not modified.
+    # The dataframes themselves are shared with the reader, and their columns are categoricals of strings: writing a
+    # value that is not already a category of the column into a cell raises TypeError (convert the dataframe with
+    # astype(str) first to edit it).
+    def get_tables(self) -> Dict[str, List[DataFrame]]:
+        self._load_all_groups()
+        return {table_group: tables.copy() for table_group, tables in self._tables_by_group.items()}
 
     def print_tables(self):
+        self._load_all_groups()
         for group_name, tables in self._tables_by_group.items():
             print(f"Group: {group_name}")
             for index, table in enumerate(tables):
@@ -187,11 +489,76 @@ class ChevroletPDFReader:
                 print('')
 
 
+# This class reads many PDF files with the same settings, reusing a single Java VM for all of them.
+#
+# tabula-py starts a Java VM for every PDF file when running in subprocess mode, and that startup usually costs more
+# than parsing the catalog itself. A session always uses the in-process (JPype) mode, so only the first PDF file pays
+# for the Java VM startup. The time spent reading each PDF file is recorded, so the latencies can be compared with the
+# subprocess mode (force_subprocess=True), see benchmarks/chevrolet_session.py.
+# The in-process mode needs JPype (the jpype1 package). Without it, tabula-py falls back to the subprocess mode for
+# every PDF file, so a warning is issued when the session is created.
+#
+# tabula-py keeps its backend in a single global of the process: once any PDF file is read with force_subprocess=True
+# (by a reader or by another session), every later read in the process runs in subprocess mode too. Mixing both modes
+# in one process is not supported. The backend actually used is checked after every read, and a warning is issued if
+# it is not the in-process one (see reuses_java_vm).
+class ChevroletPDFReaderSession:
+    def __init__(self, encoding: str = 'ANSI', fuzzy_matching_ratio_threshold: int = 75,
+                 force_subprocess: bool = False):
+        self._encoding = encoding
+        self._fuzzy_matching_ratio_threshold = fuzzy_matching_ratio_threshold
+        self._force_subprocess = force_subprocess
+        # Whether the same Java VM is reused by every PDF file (updated after every read, see _check_backend).
+        self._reuses_java_vm = not force_subprocess and find_spec('jpype') is not None
+        if not force_subprocess and not self._reuses_java_vm:
+            warnings.warn('JPype is not installed, so tabula-py starts a new Java VM for every PDF file and the '
+                          'session reuses nothing. Install the jpype1 package to reuse a single Java VM.',
+                          RuntimeWarning, stacklevel=2)
+        # Seconds spent reading each PDF file, in the order they were read.
+        self._latencies: List[float] = []
+
+    # Method that reads a single PDF file (path or bytes) and returns its reader.
+    def read(self, pdf_bytes: Union[str, BytesIO]) -> ChevroletPDFReader:
+        start = perf_counter()
+        reader = ChevroletPDFReader(pdf_bytes, encoding=self._encoding,
+                                    fuzzy_matching_ratio_threshold=self._fuzzy_matching_ratio_threshold,
+                                    force_subprocess=self._force_subprocess)
+        self._latencies.append(perf_counter() - start)
+        self._check_backend()
+        return reader
+
+    # Method that checks, after a read in the in-process mode, that tabula-py really used the in-process backend.
+    # It warns once if it didn't (JPype failed to start, or a subprocess read happened before in the process).
+    def _check_backend(self) -> None:
+        if self._force_subprocess or not self._reuses_java_vm:
+            return
+        # tabula-py doesn't expose its backend, it is kept in a module global.
+        if not isinstance(tabula.io._tabula_vm, TabulaVm):
+            self._reuses_java_vm = False
+            warnings.warn('tabula-py is running in subprocess mode, so it starts a new Java VM for every PDF file and '
+                          'the session reuses nothing. This happens when a PDF file was read with '
+                          'force_subprocess=True earlier in the process.', RuntimeWarning, stacklevel=3)
+
+    # Method that reads a batch of PDF files (paths or bytes) and returns their readers, in the same order.
+    def read_all(self, pdfs: List[Union[str, BytesIO]]) -> List[ChevroletPDFReader]:
+        return [self.read(pdf) for pdf in pdfs]
+
+    # Method that returns whether the same Java VM is reused by every PDF file read by the session.
+    # Before the first read, it only tells if JPype is installed; after it, it tells which backend tabula-py used.
+    def reuses_java_vm(self) -> bool:
+        return self._reuses_java_vm
+
+    # Method that returns the seconds spent reading each PDF file, in the order they were read.
+    # The first value includes the Java VM startup when running in-process.
+    def get_latencies(self) -> List[float]:
+        return self._latencies.copy()
+
+
 # ======================================================================================================================
 # Demo usage, uncomment to test.
 
 # # Instantiate the reader.
-# reader = ChevroletPDFReader('carros.pdf')
+# reader = ChevroletPDFReader('chevrolet_pdfs/2023carros.pdf')
 
 # # Example 1: Get the value of the cell in the 'Marca/Modelo' column in the first line of the first table in the
 # # 'Introduction' group.
@@ -216,6 +583,8 @@ class ChevroletPDFReader:
 #     ChevroletPDFReader.CONFIGURATION_GROUP, 0, 'LT Turbo 116cv', (0, 'Brake Light'))
 # print(f"Value 4: {value_4}")
 
-reader = ChevroletPDFReader("carros.pdf")
+# Guarded so that modules importing this one (e.g. CatalogIngestor) don't run it.
+if __name__ == '__main__':
+    reader = ChevroletPDFReader("chevrolet_pdfs/2023carros.pdf")
 
-reader.print_tables()
+    reader.print_tables()
@@ -1,9 +1,24 @@
+import logging
 import pdfplumber
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from hashlib import sha256
 from io import BytesIO
+from mmap import ACCESS_READ, mmap
+from time import perf_counter
+from pdfminer.pdftypes import PDFObjRef, PDFStream
+from types import MappingProxyType
 from pdfplumber.page import Page
 from fuzzywuzzy import fuzz
-from typing import Dict, List, Union
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, MutableMapping, NamedTuple, Optional, Tuple, Union
 from re import search
+from PDFParseCache import PDFParseCache
+from ReaderMetrics import ReaderMetrics
+
+# Logger of the module. Nothing is logged unless the application configures logging (e.g. at DEBUG level).
+logger = logging.getLogger(__name__)
 
 
 # Method that uses Fuzzy string matching to check if two strings are similar.
@@ -14,6 +29,132 @@ def is_similar(str1, str2, ratio: int = 75):
     return fuzz.ratio(str.lower(str1), str.lower(str2)) >= ratio
 
 
+# Class that checks if lines are similar to a fixed pattern, with the same results as is_similar.
+# Most lines can't possibly reach the ratio, so they are rejected with cheap upper bounds before the fuzzy matching:
+# - Length window: two strings can't have more matching characters than the shortest one has.
+# - Character counts: they can't have more matching characters than the characters they have in common.
+# Only the lines that pass both checks are compared with fuzz.ratio.
+# pattern: The string that lines are compared to.
+# ratio (optional): Minimum ratio of similarity between the line and the pattern.
+# metrics (optional): If given, the fuzzy comparisons actually made are counted in it.
+class LineMatcher:
+    def __init__(self, pattern: str, ratio: int = 75, metrics: ReaderMetrics = None):
+        self._pattern = str.lower(pattern)
+        self._pattern_counts = Counter(self._pattern)
+        self._ratio = ratio
+        self._metrics = metrics
+
+    # Method that checks if the line is similar to the pattern.
+    def is_similar(self, line: str) -> bool:
+        line = str.lower(line)
+        total_length = len(line) + len(self._pattern)
+        # fuzz.ratio is round(100 * 2 * matches / total_length), so it can't reach the ratio when the upper bound of
+        # the matches gives less than (ratio - 0.5).
+        minimum_matches = (self._ratio - 0.5) * total_length / 200
+        if min(len(line), len(self._pattern)) < minimum_matches:
+            return False
+        if sum((Counter(line) & self._pattern_counts).values()) < minimum_matches:
+            return False
+        if self._metrics is not None:
+            self._metrics.fuzzy_comparisons += 1
+        return fuzz.ratio(line, self._pattern) >= self._ratio
+
+
+# Function that extracts the text of a PDF page and splits it into lines.
+# page: The pdfplumber page to be extracted.
+def extract_page_lines(page: Page) -> List[str]:
+    page_content = page.extract_text()
+    return page_content.split('\n')
+
+
+# Function that computes the fingerprint of a PDF page without extracting its text.
+# It hashes everything the text extraction reads: the page boxes and rotation, the content streams and, recursively,
+# every object reachable from the page resources (fonts with their encodings, ToUnicode maps and embedded font files,
+# Form XObjects and their own resources, ...). The pdfplumber version is hashed too, since it may extract the same
+# page differently. So two pages with the same fingerprint have the same text.
+# page: The pdfplumber page.
+# object_digests (optional): Digests of the indirect objects already hashed, by object id. Objects like fonts are
+#                            shared by many pages, passing the same dictionary for the pages of a PDF file hashes them
+#                            only once. It must not be shared between PDF files.
+def page_fingerprint(page: Page, object_digests: Dict[int, bytes] = None) -> str:
+    if object_digests is None:
+        object_digests = {}
+    page_object = page.page_obj
+    fingerprint = sha256()
+    fingerprint.update(f'{pdfplumber.__version__}:{page_object.mediabox}:{page_object.cropbox}:'
+                       f'{page_object.rotate}'.encode('utf-8'))
+    fingerprint.update(_pdf_object_digest(page_object.contents, object_digests, set()))
+    fingerprint.update(_pdf_object_digest(page_object.resources, object_digests, set()))
+    return fingerprint.hexdigest()
+
+
+# Function that hashes a PDF object and the objects it references, used by page_fingerprint.
+# visiting: Ids of the indirect objects being hashed, to stop at reference cycles (e.g. /Parent entries).
+def _pdf_object_digest(pdf_object: Any, object_digests: Dict[int, bytes], visiting: set) -> bytes:
+    if isinstance(pdf_object, PDFObjRef):
+        object_id = pdf_object.objid
+        if object_id in object_digests:
+            return object_digests[object_id]
+        if object_id in visiting:
+            return f'cycle:{object_id}'.encode('utf-8')
+        visiting.add(object_id)
+        digest = _pdf_object_digest(pdf_object.resolve(), object_digests, visiting)
+        visiting.remove(object_id)
+        object_digests[object_id] = digest
+        return digest
+    digest = sha256()
+    if isinstance(pdf_object, dict):
+        digest.update(b'dict')
+        for key in sorted(pdf_object, key=str):
+            digest.update(str(key).encode('utf-8'))
+            digest.update(_pdf_object_digest(pdf_object[key], object_digests, visiting))
+    elif isinstance(pdf_object, list):
+        digest.update(b'list')
+        for item in pdf_object:
+            digest.update(_pdf_object_digest(item, object_digests, visiting))
+    elif isinstance(pdf_object, PDFStream):
+        digest.update(b'stream')
+        digest.update(_pdf_object_digest(pdf_object.attrs, object_digests, visiting))
+        digest.update(pdf_object.get_data())
+    else:
+        digest.update(repr(pdf_object).encode('utf-8'))
+    return digest.digest()
+
+
+# Function that compares the cars of two versions of a catalog.
+# Cars are matched by 'sigla' and 'ano' (model year). It returns a dictionary with:
+# - 'added': the cars only in the new version.
+# - 'removed': the cars only in the old version.
+# - 'repriced': the cars in both versions whose 'preco' changed, as {'sigla', 'ano', 'old_preco', 'new_preco'}.
+# old_cars: The cars of the old version, as returned by JeepPDFReader.get_cars.
+# new_cars: The cars of the new version, as returned by JeepPDFReader.get_cars.
+def diff_cars(old_cars: Dict[str, Dict[str, str]], new_cars: Dict[str, Dict[str, str]]) -> Dict[str, List[Any]]:
+    old_by_key = {(car[SIGLA], car[ANO]): car for car in old_cars.values()}
+    new_by_key = {(car[SIGLA], car[ANO]): car for car in new_cars.values()}
+    repriced = []
+    for key, new_car in new_by_key.items():
+        old_car = old_by_key.get(key)
+        if old_car is not None and old_car[PRECO] != new_car[PRECO]:
+            repriced.append({SIGLA: key[0], ANO: key[1], 'old_preco': old_car[PRECO], 'new_preco': new_car[PRECO]})
+    return {
+        'added': [car for key, car in new_by_key.items() if key not in old_by_key],
+        'removed': [car for key, car in old_by_key.items() if key not in new_by_key],
+        'repriced': repriced,
+    }
+
+
+# Function that opens a PDF file and extracts the lines of a range of its pages.
+# It is meant to be run in a worker process, so it only receives picklable arguments.
+# target: Path to the PDF file or the PDF file bytes.
+# start: Index of the first page to be extracted.
+# stop: Index after the last page to be extracted.
+def extract_pages_lines_range(target: Union[str, bytes], start: int, stop: int) -> List[List[str]]:
+    if isinstance(target, bytes):
+        target = BytesIO(target)
+    with pdfplumber.open(target) as pdf:
+        return [extract_page_lines(page) for page in pdf.pages[start:stop]]
+
+
 # Constants.
 #
 # Field names of the first and only table of the PDF file.
@@ -40,14 +181,161 @@ POSSIBLE_FUEL_TYPES = ['flex', 'diesel', 'gasolina']
 # Regex constants.
 #
 # Regex to match the 'potência' information.
-POTENCIA_REGEX = r'Potência máxima \(cv\) : ([0-9]+cv)'
+# Some catalogs print the value without the 'cv' suffix (e.g. 'Potência máxima (cv) : 185').
+POTENCIA_REGEX = r'Potência máxima \(cv\) : ([0-9]+)(?:cv)?'
+#
+# Kinds of the events yielded by JeepPDFReader.iter_cars.
+#
+# A car was read from the price table, the event data has all its basic data.
+CAR_EVENT = 'car'
+# More data of a car was read from its details section, the event data has only the new fields.
+UPDATE_EVENT = 'update'
+#
+# Fields of the cars that JeepCarTable has indexes on.
+INDEXED_FIELDS = [SIGLA, ANO, LINHA, COMBUSTIVEL]
+
+
+# Function that parses a price like '242.990,00' into a number.
+def parse_preco(preco: str) -> float:
+    return float(preco.replace('.', '').replace(',', '.'))
+
+
+# Function that parses a 'potência' like '185cv' into a number, or returns None if the car has no 'potência'.
+def parse_potencia(potencia: Optional[str]) -> Optional[int]:
+    if potencia is None:
+        return None
+    potencia = potencia.lower()
+    if potencia.endswith('cv'):
+        potencia = potencia[:-2]
+    return int(potencia)
+
+
+# Typed record of a car, with the numeric fields parsed.
+# Records are immutable tuples (no per-instance dictionary), so they can be shared without copying.
+class JeepCar(NamedTuple):
+    name: str
+    sigla: str
+    ano: int
+    desc_cat: str
+    linha: str
+    desc_renavam: str
+    marca: str
+    combustivel: str
+    preco: float
+    pagina: int
+    potencia: Optional[int]
+
+    # Method that builds a record from the data of a car, as stored by JeepPDFReader.
+    @staticmethod
+    def from_car_data(car_name: str, car_data: Dict[str, str]) -> 'JeepCar':
+        return JeepCar(car_name, car_data[SIGLA], int(car_data[ANO]), car_data[DESC_CAT], car_data[LINHA],
+                       car_data[DESC_RENAVAM], car_data[MARCA], car_data[COMBUSTIVEL], parse_preco(car_data[PRECO]),
+                       int(car_data[PAGINA]), parse_potencia(car_data.get(POTENCIA)))
+
+
+# Class that is a live, read-only view of the cars of a JeepPDFReader.
+# Nothing is copied: the data of each car is wrapped in a read-only view only when it is accessed.
+# cars: The 'cars' dictionary of the reader.
+class CarsView(Mapping):
+    def __init__(self, cars: Dict[str, Dict[str, str]]):
+        self._cars = cars
+
+    def __getitem__(self, car_name: str) -> Mapping[str, str]:
+        return MappingProxyType(self._cars[car_name])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._cars)
+
+    def __len__(self) -> int:
+        return len(self._cars)
+
+
+# Class that holds the cars of a catalog as typed records, with indexes for fast filtering.
+# There is an index on each of the INDEXED_FIELDS (text values are matched case-insensitively), and the cars sorted by
+# price for price range queries. The table is read-only, it is built once and never modified.
+# cars: The cars, as returned by JeepPDFReader.get_cars.
+class JeepCarTable:
+    def __init__(self, cars: Mapping[str, Dict[str, str]]):
+        self._records: Tuple[JeepCar, ...] = tuple(JeepCar.from_car_data(car_name, car_data)
+                                                   for car_name, car_data in cars.items())
+        self._records_by_name = {record.name: record for record in self._records}
+        # Positions of the records for each value of each indexed field.
+        self._indexes: Dict[str, Dict[Any, List[int]]] = {field: {} for field in INDEXED_FIELDS}
+        for position, record in enumerate(self._records):
+            for field in INDEXED_FIELDS:
+                self._indexes[field].setdefault(self._index_key(getattr(record, field)), []).append(position)
+        # Positions of the records sorted by price, and the sorted prices to bisect.
+        self._positions_by_preco = sorted(range(len(self._records)), key=lambda position: self._records[position].preco)
+        self._sorted_precos = [self._records[position].preco for position in self._positions_by_preco]
+
+    @staticmethod
+    def _index_key(value: Any) -> Any:
+        return str.lower(value) if isinstance(value, str) else value
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[JeepCar]:
+        return iter(self._records)
+
+    # Method that returns the car with the name, or None if there is no such car.
+    def get(self, car_name: str) -> Optional[JeepCar]:
+        return self._records_by_name.get(car_name)
+
+    # Method that returns the distinct values of an indexed field.
+    def values(self, field: str) -> List[Any]:
+        return [getattr(self._records[positions[0]], field) for positions in self._indexes[field].values()]
+
+    # Method that returns the cars that match all the given criteria, in catalog order.
+    # Criteria left as None are not applied.
+    # sigla, ano, linha, combustivel (optional): Values the fields must be equal to.
+    # min_preco, max_preco (optional): Inclusive price range.
+    def filter(self, sigla: str = None, ano: int = None, linha: str = None, combustivel: str = None,
+               min_preco: float = None, max_preco: float = None) -> List[JeepCar]:
+        candidates: Optional[set] = None
+        for field, value in ((SIGLA, sigla), (ANO, ano), (LINHA, linha), (COMBUSTIVEL, combustivel)):
+            if value is None:
+                continue
+            positions = self._indexes[field].get(self._index_key(value), [])
+            candidates = set(positions) if candidates is None else candidates.intersection(positions)
+            if not candidates:
+                return []
+        if min_preco is not None or max_preco is not None:
+            start = 0 if min_preco is None else bisect_left(self._sorted_precos, min_preco)
+            stop = len(self._sorted_precos) if max_preco is None else bisect_right(self._sorted_precos, max_preco)
+            positions = self._positions_by_preco[start:stop]
+            candidates = set(positions) if candidates is None else candidates.intersection(positions)
+        if candidates is None:
+            return list(self._records)
+        return [self._records[position] for position in sorted(candidates)]
 
 
 # JeepPDFReader class that reads a PDF file and extracts the data from it.
 # file_path: Path to the PDF file.
 class JeepPDFReader:
+    # Version of the parsed state, used by the parse cache.
+    # It must be incremented whenever the contents of the 'cars' dictionary change.
+    CACHE_VERSION = 1
+
     # Constructor of the class.
-    def __init__(self, pdf_bytes: BytesIO = None, file_path: str = ''):
+    # workers (optional): Number of worker processes used to extract the text of the pages.
+    #                     If it is 1, the pages are extracted serially in the current process.
+    # cache (optional): On-disk parse cache. If the same PDF file was already parsed, the 'cars' dictionary is loaded
+    #                   from it and the PDF file is not opened.
+    # stream (optional): If True, the PDF file is not parsed by the constructor, but while iterating over iter_cars.
+    #                    The parse cache is then looked up when iter_cars starts, and filled when it finishes.
+    # metrics (optional): Object that records stage and page durations, lines scanned, fuzzy comparisons and cars
+    #                     produced. A new one is created if not given, see get_metrics.
+    # page_cache (optional): Mapping from page fingerprints (see page_fingerprint) to page lines, e.g. a dict or a
+    #                        shelve. Pages already in it are not extracted again, and new pages are added to it.
+    #                        Passing the mapping used for yesterday's catalog re-extracts only the changed pages.
+    #                        The pages are extracted serially when it is given.
+    # low_memory (optional): If True, each page is parsed as soon as its text is extracted, and then released, so the
+    #                        peak memory doesn't grow with the number of pages. A file path is memory-mapped instead of
+    #                        read through a buffer. The pages are extracted serially.
+    def __init__(self, pdf_bytes: BytesIO = None, file_path: str = '', workers: int = 1,
+                 cache: PDFParseCache = None, stream: bool = False, metrics: ReaderMetrics = None,
+                 page_cache: MutableMapping[str, List[str]] = None, low_memory: bool = False):
         if pdf_bytes is not None and file_path != '':
             raise ValueError('You must provide either a PDF file path or a PDF file bytes, not both.')
         elif pdf_bytes is not None:
@@ -56,10 +344,57 @@ class JeepPDFReader:
             self._target: Union[str, BytesIO] = file_path
         else:
             raise ValueError('You must provide either a PDF file path or a PDF file bytes.')
+        if workers < 1:
+            raise ValueError('The number of workers must be at least 1.')
+        self._workers = workers
+        self._page_cache = page_cache
+        self._low_memory = low_memory
         self._cars: Dict[str, Dict[str, str]] = {}
         self._column_names: List[str] = []
+        # Number of pages whose text was extracted while parsing the PDF file.
+        self._pages_extracted = 0
+        self._metrics = metrics if metrics is not None else ReaderMetrics()
+        # Matchers used to classify the lines of the pages.
+        self._column_names_matcher = LineMatcher(COLUMN_NAMES_STRING_MATCH, metrics=self._metrics)
+        self._table_footer_matcher = LineMatcher(TABLE_FOOTER_STRING_MATCH, metrics=self._metrics)
+        # Whether the 'cars' dictionary is complete.
+        self._parsed = False
+        # Typed and indexed table of the cars, built on the first call to get_car_table.
+        self._car_table: Optional[JeepCarTable] = None
+        # Incremented every time a parse starts, so that an older parse can tell it was replaced.
+        self._parse_generation = 0
+        self._cache = cache
+        self._cache_key = ''
+        # In stream mode, the PDF file is parsed by iter_cars.
+        if stream:
+            return
+        # Try to load the 'cars' dictionary from the parse cache.
+        if self._load_cached_cars():
+            return
         # Call the method to populate the 'cars' dictionary with basic data.
         self._build_cars_dict()
+        self._store_cached_cars()
+
+    # Method that loads the 'cars' dictionary from the parse cache, if there is one.
+    # It returns True if the PDF file was found in the cache.
+    def _load_cached_cars(self) -> bool:
+        if self._cache is None:
+            return False
+        self._cache_key = PDFParseCache.make_key(self._target, JeepPDFReader.__name__, JeepPDFReader.CACHE_VERSION)
+        cached_cars = self._cache.get(self._cache_key)
+        if cached_cars is None:
+            return False
+        # The cars are loaded in place, discarding the ones read by a parse that didn't finish.
+        self._reset_parse_state()
+        self._cars.update(cached_cars)
+        self._metrics.cars += len(cached_cars)
+        self._parsed = True
+        return True
+
+    # Method that stores the 'cars' dictionary in the parse cache, if there is one.
+    def _store_cached_cars(self) -> None:
+        if self._cache is not None:
+            self._cache.put(self._cache_key, self._cars)
 
     # Method that reads the PDF file and extracts the data from it.
     # It is called by the constructor.
@@ -78,134 +413,288 @@ class JeepPDFReader:
     #   },
     #   ...
     def _build_cars_dict(self) -> None:
+        # The text of each page is extracted only once and shared by both parsing stages.
+        # In low memory mode, the lines of each page are dropped as soon as the page is parsed.
+        pages_lines = self._iter_pages_lines() if self._low_memory else self._extract_pages_lines()
+        for _ in self._parse_pages(pages_lines):
+            pass
+        self._parsed = True
+
+    # Method that parses the lines of the pages, one page at a time.
+    # It is a generator that yields the parsing events as soon as they happen:
+    # - (CAR_EVENT, car_name, car_data): a car was read from the price table, with its basic data.
+    # - (UPDATE_EVENT, car_name, car_data): more data of a car was read from its details section (e.g. 'potencia').
+    # Each page goes through the price table stage (_read_cars_table) and then through the car details stage
+    # (_fill_cars_data), so only the lines of the current page are needed.
+    # pages_lines: The lines of each page, in page order.
+    # Starting a new parse discards the cars read by a previous one that didn't finish, and resuming the previous one
+    # afterwards raises RuntimeError.
+    def _parse_pages(self, pages_lines: Iterable[List[str]]) -> Iterator[Tuple[str, str, Dict[str, str]]]:
+        self._reset_parse_state()
+        generation = self._parse_generation
+        # Iterates through the pages of the PDF file.
+        for lines in pages_lines:
+            if generation != self._parse_generation:
+                raise RuntimeError('Another parse of the PDF file was started.')
+            self._metrics.lines_scanned += len(lines)
+            yield from self._metrics.timed('read_cars_table', self._read_cars_table(lines))
+            yield from self._metrics.timed('fill_cars_data', self._fill_cars_data(lines))
+
+    # Method that resets the state kept between pages by the parsing stages.
+    # The cars read by a previous parse are removed (in place, so the views from get_cars_view stay live), otherwise
+    # they would not be matched again with their details sections.
+    def _reset_parse_state(self) -> None:
+        self._parse_generation += 1
+        self._metrics.cars -= len(self._cars)
+        self._cars.clear()
+        self._car_table = None
+        # State of the price table stage.
+        self._reading_cars = False
+        # State of the car details stage.
+        self._car_names: List[str] = []
+        self._current_car_index = 0
+        self._reading_car = False
+
+    # Method responsible for reading the cars from the price table (first table) of the PDF file.
+    # It is called by the _parse_pages method for every page, and yields a CAR_EVENT for each car read.
+    # lines: The lines of the page.
+    def _read_cars_table(self, lines: List[str]) -> Iterator[Tuple[str, str, Dict[str, str]]]:
+        # Iterates through the lines of the page.
+        for line in lines:
+            # If in the process of reading the cars (first table)...
+            if self._reading_cars:
+                # Creating the car_data_parsed list.
+                # This list will contain the data of the car.
+                # The name of the car might contain spaces, and when split by spaces, it will be split into
+                # multiple elements. We have to join these elements back together.
+                # Car data not parsed yet.
+                car_data = line.split(' ')
+                # Car data from positions 3 to the end (CAR NAME PARTS, FUEL TYPE, PRICE and PAGE)
+                card_data_sub = car_data[2:]
+                # Car data from positions 0 to 2. (MVS, MY and DESCRIÇÃO)
+                car_data_parsed = car_data[:3]
+                # Car data parsed with the car name joined back together.
+                car_data_parsed[-1] = ''
+                # Index where the fuel type is located.
+                fuel_type_index = -1
+                for i in range(len(card_data_sub)):
+                    data = card_data_sub[i]
+                    # If the data is a fuel type, the car name has ended.
+                    # Break the for loop.
+                    if str.lower(data) in POSSIBLE_FUEL_TYPES:
+                        # Ok, we are now reading data from the fuel type column.
+                        # Let's trim the car name, which is the last element of the car_data_parsed list.
+                        car_data_parsed[-1] = car_data_parsed[-1].strip()
+                        # And append the fuel type to the car_data_parsed list.
+                        car_data_parsed.append(data)
+                        fuel_type_index = i + 1
+                        break
+                    # If the data is not a fuel type, it is part of the car name.
+                    # Join it back together in the last element of the car_data_parsed list.
+                    else:
+                        car_data_parsed[-1] += ' ' + data
+                # Append the rest of the data to the car_data_parsed list.
+                car_data_parsed += card_data_sub[fuel_type_index:]
+                # Get the 'sigla', which is the key of the car in the dictionary.
+                sigla = car_data[0]
+                # If the 'sigla' is valid and the line is not the table footer...
+                # It means that we still have cars to process.
+                if len(sigla) == 7 and not self._table_footer_matcher.is_similar(line):
+                    # Get the car name, it will be used as the key of the car in the dictionary.
+                    car_name = car_data_parsed[2]
+                    if car_name not in self._cars:
+                        self._car_names.append(car_name)
+                        self._metrics.cars += 1
+                    self._cars[car_name] = {}
+                    for i in range(len(COLUMN_NAMES)):
+                        self._cars[car_name][COLUMN_NAMES[i]] = car_data_parsed[i]
+                    # Set car's custom attributes.
+                    car_parts = self._cars[car_name][DESC_CAT].split(' ')
+                    desc_renavam = car_parts[1:]
+                    linha = car_parts[0]
+                    self._cars[car_name][LINHA] = linha
+                    self._cars[car_name][DESC_RENAVAM] = ' '.join(desc_renavam)
+                    self._cars[car_name][MARCA] = 'JEEP'
+                    yield CAR_EVENT, car_name, self._cars[car_name].copy()
+                else:
+                    # If the 'sigla' is not valid or the line is the table footer...
+                    # It means that we have finished processing the cars.
+                    # Exit the for loop.
+                    break
+            # If not in the process of reading the cars...
+            elif self._column_names_matcher.is_similar(line):
+                self._reading_cars = True
+
+    # Method that extracts the text of every page of the PDF file, split into lines.
+    # It is called by the _build_cars_dict method.
+    # Each page is extracted exactly once, the result is a list with the lines of each page.
+    def _extract_pages_lines(self) -> List[List[str]]:
+        if self._workers > 1 and self._page_cache is None:
+            return self._extract_pages_lines_parallel()
+        return list(self._iter_pages_lines())
+
+    # Method that extracts the lines of a single page, recording the time spent on it.
+    # If there is a page cache, pages with a known fingerprint are not extracted.
+    def _extract_page(self, page: Page) -> List[str]:
+        fingerprint = ''
+        if self._page_cache is not None:
+            fingerprint = page_fingerprint(page, self._object_digests)
+            cached_lines = self._page_cache.get(fingerprint)
+            if cached_lines is not None:
+                return cached_lines
+        start = perf_counter()
+        lines = extract_page_lines(page)
+        if self._page_cache is not None:
+            self._page_cache[fingerprint] = lines
+        seconds = perf_counter() - start
+        self._metrics.add_stage_time('extraction', seconds)
+        self._metrics.add_page(seconds, len(lines))
+        self._pages_extracted += 1
+        return lines
+
+    # Method that extracts the text of the pages one at a time, split into lines.
+    # It is used by the iter_cars method. Each page's cached objects are released as soon as its text is extracted,
+    # so only one page is kept in memory at a time.
+    def _iter_pages_lines(self) -> Iterator[List[str]]:
+        # Digests of the objects shared by the pages of this PDF file, see page_fingerprint.
+        self._object_digests: Dict[int, bytes] = {}
+        with self._open_pdf() as pdf:
+            for page in pdf.pages:
+                lines = self._extract_page(page)
+                page.close()
+                yield lines
+
+    # Context manager that opens the PDF file with pdfplumber.
+    # In low memory mode, a file path is memory-mapped, so the file is paged in and out by the operating system.
+    @contextmanager
+    def _open_pdf(self) -> Iterator[pdfplumber.PDF]:
+        if not self._low_memory or not isinstance(self._target, str):
+            with pdfplumber.open(self._target) as pdf:
+                yield pdf
+            return
+        with open(self._target, 'rb') as file, mmap(file.fileno(), 0, access=ACCESS_READ) as mapped_file, \
+                pdfplumber.open(mapped_file) as pdf:
+            yield pdf
+
+    # Method that extracts the text of the pages across a pool of worker processes.
+    # It is called by the _extract_pages_lines method when more than one worker is requested.
+    # The pages are split into contiguous ranges, one per worker, and the results are kept in page order, so
+    # the parsing stages see exactly the same lines as in serial mode.
+    def _extract_pages_lines_parallel(self) -> List[List[str]]:
+        # Worker processes can't share the file object, so they receive the path or the raw bytes.
+        if isinstance(self._target, str):
+            target: Union[str, bytes] = self._target
+        else:
+            target = self._target.getvalue()
         with pdfplumber.open(self._target) as pdf:
-            pages = pdf.pages
-            reading_cars = False
-            # Iterates through the pages of the PDF file.
-            for page in pages:
-                page_content = page.extract_text()
-                lines = page_content.split('\n')
-                # Iterates through the lines of the page.
-                for line in lines:
-                    # If in the process of reading the cars (first table)...
-                    if reading_cars:
-                        # Creating the car_data_parsed list.
-                        # This list will contain the data of the car.
-                        # The name of the car might contain spaces, and when split by spaces, it will be split into
-                        # multiple elements. We have to join these elements back together.
-                        # Car data not parsed yet.
-                        car_data = line.split(' ')
-                        # Car data from positions 3 to the end (CAR NAME PARTS, FUEL TYPE, PRICE and PAGE)
-                        card_data_sub = car_data[2:]
-                        # Car data from positions 0 to 2. (MVS, MY and DESCRIÇÃO)
-                        car_data_parsed = car_data[:3]
-                        # Car data parsed with the car name joined back together.
-                        car_data_parsed[-1] = ''
-                        # Index where the fuel type is located.
-                        fuel_type_index = -1
-                        for i in range(len(card_data_sub)):
-                            data = card_data_sub[i]
-                            # If the data is a fuel type, the car name has ended.
-                            # Break the for loop.
-                            if str.lower(data) in POSSIBLE_FUEL_TYPES:
-                                # Ok, we are now reading data from the fuel type column.
-                                # Let's trim the car name, which is the last element of the car_data_parsed list.
-                                car_data_parsed[-1] = car_data_parsed[-1].strip()
-                                # And append the fuel type to the car_data_parsed list.
-                                car_data_parsed.append(data)
-                                fuel_type_index = i + 1
-                                break
-                            # If the data is not a fuel type, it is part of the car name.
-                            # Join it back together in the last element of the car_data_parsed list.
-                            else:
-                                car_data_parsed[-1] += ' ' + data
-                        # Append the rest of the data to the car_data_parsed list.
-                        car_data_parsed += card_data_sub[fuel_type_index:]
-                        # Get the 'sigla', which is the key of the car in the dictionary.
-                        sigla = car_data[0]
-                        # If the 'sigla' is valid and the line is not the table footer...
-                        # It means that we still have cars to process.
-                        if len(sigla) == 7 and not is_similar(line, TABLE_FOOTER_STRING_MATCH):
-                            # Get the car name, it will be used as the key of the car in the dictionary.
-                            car_name = car_data_parsed[2]
-                            self._cars[car_name] = {}
-                            for i in range(len(COLUMN_NAMES)):
-                                self._cars[car_name][COLUMN_NAMES[i]] = car_data_parsed[i]
-                            # Set car's custom attributes.
-                            car_parts = self._cars[car_name][DESC_CAT].split(' ')
-                            desc_renavam = car_parts[1:]
-                            linha = car_parts[0]
-                            self._cars[car_name][LINHA] = linha
-                            self._cars[car_name][DESC_RENAVAM] = ' '.join(desc_renavam)
-                            self._cars[car_name][MARCA] = 'JEEP'
-                        else:
-                            # If the 'sigla' is not valid or the line is the table footer...
-                            # It means that we have finished processing the cars.
-                            # Exit the for loop.
-                            break
-                    # If not in the process of reading the cars...
-                    elif is_similar(line, COLUMN_NAMES_STRING_MATCH):
-                        reading_cars = True
-            # Fill the rest of the data of the cars.
-            # Call the _fill_cars_data method.
-            self._fill_cars_data(pages)
+            page_count = len(pdf.pages)
+        if page_count == 0:
+            return []
+        chunk_size = -(-page_count // self._workers)
+        ranges = [(start, min(start + chunk_size, page_count)) for start in range(0, page_count, chunk_size)]
+        pages_lines: List[List[str]] = []
+        # The pages are extracted by the workers, so only the duration of the whole stage is known.
+        with self._metrics.stage('extraction'), \
+                ProcessPoolExecutor(max_workers=min(self._workers, max(len(ranges), 1))) as executor:
+            futures = [executor.submit(extract_pages_lines_range, target, start, stop) for start, stop in ranges]
+            for future in futures:
+                pages_lines += future.result()
+        self._pages_extracted += len(pages_lines)
+        return pages_lines
 
     # Method responsible for filling the rest of the data of the cars.
-    # It is called by the _build_cars_dict method.
-    def _fill_cars_data(self, pages: List[Page]) -> None:
-        car_names = list(self._cars.keys())
-        current_car_index = 0
-        current_car = car_names[current_car_index]
-        next_car_index = 1
-        next_car = car_names[next_car_index]
-        reading_car = False
-        for page in pages:
-            page_content = page.extract_text()
-            lines = page_content.split('\n')
-            for line in lines:
-                # If the current_car is None, it means that we have finished reading all the cars.
-                # Exit the method.
-                if current_car is None:
-                    return
-                # Check if the line is equal to the next car name.
-                # If so, set the reading_car flag to True.
-                if str.lower(line).strip() == str.lower(current_car).strip():
-                    print(f'[Now Processing {current_car}]')
-                    reading_car = True
+    # It is called by the _parse_pages method for every page, after the price table stage has read the page, and
+    # yields an UPDATE_EVENT for each piece of data found.
+    # The details sections of the cars appear in the same order as the cars in the price table.
+    # lines: The lines of the page.
+    def _fill_cars_data(self, lines: List[str]) -> Iterator[Tuple[str, str, Dict[str, str]]]:
+        for line in lines:
+            # If there is no current car, all the cars read so far have been processed.
+            # Skip the rest of the page.
+            if self._current_car_index >= len(self._car_names):
+                return
+            current_car = self._car_names[self._current_car_index]
+            # Check if the line is equal to the next car name.
+            # If so, set the reading_car flag to True.
+            if str.lower(line).strip() == str.lower(current_car).strip():
+                logger.debug('Now processing %s', current_car)
+                self._reading_car = True
+                continue
+            # If reading a car...
+            if self._reading_car:
+                # Check if the line is equal to the pdf footer.
+                # If so, we have finished reading the car.
+                # Move on to the next car.
+                if self._table_footer_matcher.is_similar(line):
+                    logger.debug('Finished processing %s', current_car)
+                    self._reading_car = False
+                    self._current_car_index += 1
                     continue
-                # If reading a car...
-                if reading_car:
-                    print(line)
-                    # Check if the line is equal to the pdf footer.
-                    # If so, we have finished reading the car.
-                    # Move on to the next car.
-                    if is_similar(line, TABLE_FOOTER_STRING_MATCH):
-                        print(f'[Finished processing {current_car}]')
-                        reading_car = False
-                        current_car_index = next_car_index
-                        current_car = next_car
-                        if current_car_index + 1 < len(car_names):
-                            next_car_index += 1
-                            next_car = car_names[next_car_index]
-                        else:
-                            next_car = None
+                # If the line is not equal to the pdf footer...
+                # We are still reading the car.
+                #
+                # Check if it is the line with the 'potência' information.
+                if str.lower(line).startswith('modelo:'):
+                    result = search(POTENCIA_REGEX, line)
+                    # Skip the line if it has no 'potência' information.
+                    if result is None:
+                        logger.debug('No potência found for %s', current_car)
                         continue
-                    # If the line is not equal to the pdf footer...
-                    # We are still reading the car.
-                    #
-                    # Check if it is the line with the 'potência' information.
-                    if str.lower(line).startswith('modelo:'):
-                        result = search(POTENCIA_REGEX, line)
-                        potencia = result.group(1)
-                        self._cars[current_car][POTENCIA] = potencia
+                    potencia = result.group(1) + 'cv'
+                    self._cars[current_car][POTENCIA] = potencia
+                    yield UPDATE_EVENT, current_car, {POTENCIA: potencia}
 
     # Method that returns the cars extracted from the PDF file.
     # It returns a copy of the dictionary, so that the original dictionary is not modified.
     def get_cars(self) -> Dict[str, Dict[str, str]]:
         return self._cars.copy()
 
+    # Method that returns a read-only view of the cars extracted from the PDF file, without copying anything.
+    # The view is live: it also shows the cars read after it was created (e.g. while iterating over iter_cars).
+    # The data of each car is wrapped in a read-only view when it is accessed.
+    def get_cars_view(self) -> Mapping[str, Mapping[str, str]]:
+        return CarsView(self._cars)
+
+    # Method that returns the cars extracted from the PDF file as a typed and indexed table (see JeepCarTable).
+    # The table is built once, the first time it is requested after the PDF file is parsed, and then shared.
+    def get_car_table(self) -> JeepCarTable:
+        if not self._parsed:
+            raise RuntimeError('The PDF file has not been parsed yet, iterate over iter_cars first.')
+        if self._car_table is None:
+            self._car_table = JeepCarTable(self._cars)
+        return self._car_table
+
+    # Method that iterates over the cars while the PDF file is parsed.
+    # It yields (event_kind, car_name, car_data) tuples:
+    # - (CAR_EVENT, car_name, car_data) as soon as a car is read from the price table, with its basic data.
+    # - (UPDATE_EVENT, car_name, car_data) when more data of a car is read from its details section, only with the
+    #   new fields (e.g. {'potencia': '185cv'}).
+    # The pages are extracted one at a time, so results are available before the last page is processed.
+    # If the PDF file has already been parsed (or is found in the parse cache), a CAR_EVENT is yielded for each car,
+    # with all of its data. A parse left unfinished is started over by the next call.
+    def iter_cars(self) -> Iterator[Tuple[str, str, Dict[str, str]]]:
+        if not self._parsed:
+            self._load_cached_cars()
+        if self._parsed:
+            for car_name, car_data in self._cars.items():
+                yield CAR_EVENT, car_name, car_data.copy()
+            return
+        yield from self._parse_pages(self._iter_pages_lines())
+        self._parsed = True
+        self._store_cached_cars()
+
+    # Method that returns the metrics recorded while parsing the PDF file.
+    def get_metrics(self) -> ReaderMetrics:
+        return self._metrics
+
+    # Method that returns how many pages had their text extracted while parsing the PDF file.
+    def get_pages_extracted(self) -> int:
+        return self._pages_extracted
+
 
 # Testing the class.
-reader = JeepPDFReader(file_path='jeep_pdfs/jeep.pdf')
-cars = reader.get_cars()
-print(cars)
+# Guarded so that worker processes importing this module don't run it.
+if __name__ == '__main__':
+    reader = JeepPDFReader(file_path='jeep_pdfs/jeep.pdf')
+    cars = reader.get_cars()
+    print(cars)
@@ -0,0 +1,102 @@
+import os
+import pickle
+from hashlib import sha256
+from io import BytesIO
+from typing import Any, Dict, Union
+
+
+# This class is an on-disk cache for the parsed state of the PDF readers.
+#
+# Entries are keyed by the content hash of the PDF file, plus the name and version of the reader and the parameters
+# that change its output. This way, the same catalog is parsed only once, no matter the file name or the process that
+# reads it.
+#
+# Entries are stored with pickle (only point the cache to a directory you trust).
+# When the total size of the entries goes over max_size_bytes, the least recently used entries are removed.
+class PDFParseCache:
+    _ENTRY_EXTENSION = '.pickle'
+
+    # directory: Directory where the entries are stored. It is created if it doesn't exist.
+    # max_size_bytes (optional): Maximum total size of the entries.
+    def __init__(self, directory: str, max_size_bytes: int = 256 * 1024 * 1024):
+        if max_size_bytes <= 0:
+            raise ValueError('The maximum cache size must be greater than 0.')
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._max_size_bytes = max_size_bytes
+
+    # Method that builds the key of a PDF file.
+    # pdf: Path to the PDF file or the PDF file bytes.
+    # reader_name: Name of the reader class.
+    # reader_version: Version of the reader, it must change whenever the parsed state changes.
+    # parameters: Reader parameters that change the parsed state.
+    @staticmethod
+    def make_key(pdf: Union[str, BytesIO], reader_name: str, reader_version: int,
+                 parameters: Dict[str, Any] = None) -> str:
+        content_hash = sha256()
+        if isinstance(pdf, str):
+            with open(pdf, 'rb') as file:
+                for chunk in iter(lambda: file.read(1024 * 1024), b''):
+                    content_hash.update(chunk)
+        else:
+            content_hash.update(pdf.getbuffer())
+        key = sha256()
+        key.update(content_hash.digest())
+        key.update(f'{reader_name}:{reader_version}'.encode('utf-8'))
+        for name, value in sorted((parameters or {}).items()):
+            key.update(f':{name}={value!r}'.encode('utf-8'))
+        return key.hexdigest()
+
+    # Method that returns the entry stored with the key, or None if there is no such entry.
+    # Entries that can't be loaded (e.g. truncated, or pickled by incompatible versions of the classes they hold) are
+    # removed and count as a miss.
+    def get(self, key: str) -> Any:
+        path = self._entry_path(key)
+        try:
+            with open(path, 'rb') as file:
+                value = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        # Mark the entry as recently used.
+        os.utime(path)
+        return value
+
+    # Method that stores an entry with the key and removes old entries if the cache is too big.
+    def put(self, key: str, value: Any) -> None:
+        path = self._entry_path(key)
+        temporary_path = f'{path}.{os.getpid()}.tmp'
+        with open(temporary_path, 'wb') as file:
+            pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+        # Replace atomically, so that other processes never read a partial entry.
+        os.replace(temporary_path, path)
+        self._evict()
+
+    # Method that removes the least recently used entries until the cache fits in max_size_bytes.
+    def _evict(self) -> None:
+        entries = []
+        for name in os.listdir(self._directory):
+            if not name.endswith(self._ENTRY_EXTENSION):
+                continue
+            try:
+                stat = os.stat(os.path.join(self._directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total_size <= self._max_size_bytes:
+                break
+            try:
+                os.remove(os.path.join(self._directory, name))
+            except OSError:
+                continue
+            total_size -= size
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self._directory, key + self._ENTRY_EXTENSION)
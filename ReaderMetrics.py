@@ -0,0 +1,76 @@
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+# Kinds of the events sent to the ReaderMetrics callback.
+#
+# A stage finished, the event data has 'stage' and 'seconds'.
+STAGE_EVENT = 'stage'
+# A page was extracted, the event data has 'page', 'seconds' and 'lines'.
+PAGE_EVENT = 'page'
+
+
+# This class records what the PDF readers do while parsing a PDF file:
+# - The seconds spent on each stage (e.g. 'extraction', 'read_cars_table', 'initial_setup').
+# - The seconds spent extracting each page, when pages are extracted one at a time.
+# - The number of lines scanned, fuzzy comparisons made, and cars and tables produced.
+#
+# A callback can be given to receive the stage and page events as they happen, e.g. to send them to a metrics system.
+# Nothing is printed or logged by this class.
+class ReaderMetrics:
+    # callback (optional): Function called with (event_kind, event_data) for every STAGE_EVENT and PAGE_EVENT.
+    def __init__(self, callback: Callable[[str, Dict[str, Any]], None] = None):
+        self._callback = callback
+        self.stage_seconds: Dict[str, float] = {}
+        self.page_seconds: List[float] = []
+        self.lines_scanned = 0
+        self.fuzzy_comparisons = 0
+        self.cars = 0
+        self.tables = 0
+
+    # Method that adds time to a stage, and notifies the callback.
+    def add_stage_time(self, stage: str, seconds: float) -> None:
+        self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+        if self._callback is not None:
+            self._callback(STAGE_EVENT, {'stage': stage, 'seconds': seconds})
+
+    # Method that records the extraction of a page, and notifies the callback.
+    def add_page(self, seconds: float, lines: int) -> None:
+        self.page_seconds.append(seconds)
+        if self._callback is not None:
+            self._callback(PAGE_EVENT, {'page': len(self.page_seconds) - 1, 'seconds': seconds, 'lines': lines})
+
+    # Context manager that times a block of code as a stage.
+    @contextmanager
+    def stage(self, stage: str) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage_time(stage, perf_counter() - start)
+
+    # Method that times a generator as a stage.
+    # Only the time spent producing the items is counted, not the time the caller spends consuming them.
+    def timed(self, stage: str, items: Iterable[Any]) -> Iterator[Any]:
+        iterator = iter(items)
+        seconds = 0.0
+        while True:
+            start = perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_stage_time(stage, seconds + perf_counter() - start)
+                return
+            seconds += perf_counter() - start
+            yield item
+
+    # Method that returns the recorded metrics as a dictionary.
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'stage_seconds': self.stage_seconds.copy(),
+            'page_seconds': self.page_seconds.copy(),
+            'lines_scanned': self.lines_scanned,
+            'fuzzy_comparisons': self.fuzzy_comparisons,
+            'cars': self.cars,
+            'tables': self.tables,
+        }
@@ -0,0 +1,42 @@
+# Benchmark of ChevroletPDFReader._initial_setup (table grouping and sanitization).
+#
+# The tables are extracted with tabula-py only once, then _initial_setup is run many times over fresh copies of them,
+# measuring the time and the peak memory (tracemalloc) spent on each run.
+# Run it from the repository root, on the current commit and on the commit to compare with:
+#
+# python -m benchmarks.chevrolet_initial_setup [pdf_path] [repetitions]
+import sys
+import tracemalloc
+from statistics import median
+from time import perf_counter
+
+import tabula
+
+from ChevroletPDFReader import ChevroletPDFReader
+
+
+def main() -> None:
+    pdf_path = sys.argv[1] if len(sys.argv) > 1 else 'chevrolet_pdfs/2023carros.pdf'
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    dataframes = tabula.read_pdf(pdf_path, pages='all', lattice=True, multiple_tables=True, encoding='ANSI')
+    reader = ChevroletPDFReader(pdf_path)
+    times = []
+    peaks = []
+    for _ in range(repetitions):
+        copies = [dataframe.copy() for dataframe in dataframes]
+        tracemalloc.start()
+        start = perf_counter()
+        reader._initial_setup(copies)
+        times.append(perf_counter() - start)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    table_bytes = sum(table.memory_usage(deep=True).sum()
+                      for tables in reader._tables_by_group.values() for table in tables)
+    print(f'Tables: {len(dataframes)}')
+    print(f'Setup time (median of {repetitions}): {median(times) * 1000:.2f} ms')
+    print(f'Setup peak memory (median): {median(peaks) / 1024:.1f} KiB')
+    print(f'Stored tables memory: {table_bytes / 1024:.1f} KiB')
+
+
+if __name__ == '__main__':
+    main()
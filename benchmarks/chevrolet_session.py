@@ -0,0 +1,39 @@
+# Latency of reading several Chevrolet catalogs with a ChevroletPDFReaderSession.
+#
+# The same catalog is read several times in the in-process mode (one Java VM reused through JPype) and in the
+# subprocess mode (force_subprocess=True, one Java VM per catalog), each mode in a fresh process, so the first
+# in-process read pays for the Java VM startup. The latency of every read is printed.
+# The subprocess mode decodes the Java output with the reader encoding, and the readers' default ('ANSI') is only
+# known to Python on Windows, so the encoding can be given (UTF-8 by default). Run it from the repository root:
+#
+# python -m benchmarks.chevrolet_session [pdf_path] [reads] [encoding]
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from statistics import median
+from typing import List
+
+
+# Function that reads a catalog several times with a session and returns the latencies.
+# It is run in a fresh process for every mode.
+def read_latencies(pdf_path: str, reads: int, encoding: str, force_subprocess: bool) -> List[float]:
+    from ChevroletPDFReader import ChevroletPDFReaderSession
+    session = ChevroletPDFReaderSession(encoding=encoding, force_subprocess=force_subprocess)
+    session.read_all([pdf_path] * reads)
+    return session.get_latencies()
+
+
+def main() -> None:
+    pdf_path = sys.argv[1] if len(sys.argv) > 1 else 'chevrolet_pdfs/2023carros.pdf'
+    reads = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    encoding = sys.argv[3] if len(sys.argv) > 3 else 'utf-8'
+    for mode, force_subprocess in (('subprocess', True), ('in-process', False)):
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+            latencies = executor.submit(read_latencies, pdf_path, reads, encoding, force_subprocess).result()
+        print(f'{mode}: ' + ', '.join(f'{latency:.2f} s' for latency in latencies) +
+              f' (first {latencies[0]:.2f} s, median of the rest {median(latencies[1:] or latencies):.2f} s, '
+              f'total {sum(latencies):.2f} s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# Peak memory check of the JeepPDFReader as the number of pages grows.
+#
+# Synthetic catalogs are built by concatenating several copies of a Jeep catalog (with pypdfium2), and each one is
+# parsed in a fresh process, in the default mode and in low memory mode, recording the peak RSS of the process.
+# The peak RSS is read with the resource module, which is only available on POSIX systems.
+# The check fails if the peak RSS in low memory mode grows more than the allowed amount from the smallest catalog to
+# the biggest one. Run it from the repository root:
+#
+# python -m benchmarks.jeep_low_memory [pdf_path] [--copies 1 4 16] [--max-growth-mb 32]
+import argparse
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import List
+
+import pypdfium2
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+# Function that returns the peak RSS of the current process, in MB.
+def peak_rss_mb() -> float:
+    if resource is None:
+        raise RuntimeError('The peak RSS can only be read on POSIX systems (the resource module is missing).')
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+# Function that builds a PDF file with several copies of the pages of another PDF file.
+def concatenate_copies(path: str, copies: int, output_path: str) -> None:
+    source = pypdfium2.PdfDocument(path)
+    output = pypdfium2.PdfDocument.new()
+    for _ in range(copies):
+        output.import_pages(source)
+    output.save(output_path)
+
+
+# Function that parses a catalog and returns the peak RSS of the process, in MB.
+# It is run in a fresh process for every catalog and mode.
+def parse_peak_rss_mb(path: str, low_memory: bool) -> float:
+    from JeepPDFReader import JeepPDFReader
+    JeepPDFReader(file_path=path, low_memory=low_memory)
+    return peak_rss_mb()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Check that the JeepPDFReader peak memory stays flat in low memory '
+                                                 'mode as the number of pages grows.')
+    parser.add_argument('pdf_path', nargs='?', default='jeep_pdfs/jeep.pdf', help='Catalog to concatenate.')
+    parser.add_argument('--copies', type=int, nargs='+', default=[1, 4, 16], help='Numbers of copies to test.')
+    parser.add_argument('--max-growth-mb', type=float, default=32.0,
+                        help='Allowed peak RSS growth in low memory mode, from the fewest to the most copies.')
+    arguments = parser.parse_args()
+    copies: List[int] = sorted(arguments.copies)
+    low_memory_peaks = []
+    with tempfile.TemporaryDirectory() as directory:
+        for count in copies:
+            path = os.path.join(directory, f'catalog_x{count}.pdf')
+            concatenate_copies(arguments.pdf_path, count, path)
+            peaks = {}
+            for low_memory in (False, True):
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+                    peaks[low_memory] = executor.submit(parse_peak_rss_mb, path, low_memory).result()
+            low_memory_peaks.append(peaks[True])
+            print(f'{count} copies: peak RSS {peaks[False]:.1f} MB (default), {peaks[True]:.1f} MB (low memory)')
+    growth = low_memory_peaks[-1] - low_memory_peaks[0]
+    print(f'Low memory peak RSS growth from {copies[0]} to {copies[-1]} copies: {growth:.1f} MB')
+    if growth > arguments.max_growth_mb:
+        print(f'FAILED: the growth is over {arguments.max_growth_mb:.1f} MB')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+# Benchmark suite over the bundled catalogs.
+#
+# Each catalog is benchmarked in a fresh process, and each stage is timed separately:
+# - Jeep: PDF open, text extraction, price table stage (_read_cars_table, formerly _build_cars_dict) and car details
+#   stage (_fill_cars_data).
+# - Chevrolet: PDF open, table extraction (tabula-py), _initial_setup and a mix of get_column_value lookups.
+# For every stage, the median wall time, the pages processed per second and the peak memory allocated while running it
+# (tracemalloc, measured on one more run, since tracing the allocations slows the stage down) are recorded. Memory
+# allocated outside of Python, such as the Java VM used by tabula-py, is not counted. The results are saved as JSON, and can be compared with a previous run to flag regressions.
+# Run it from the repository root:
+#
+# python -m benchmarks.run_benchmarks --output results.json [--compare previous.json] [--threshold 0.2]
+import argparse
+import json
+import platform
+import random
+import sys
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from statistics import median
+from time import perf_counter, strftime
+from typing import Any, Callable, Dict, List
+
+import pdfplumber
+
+JEEP_CATALOGS = ['jeep_pdfs/jeep.pdf', 'jeep_pdfs/jeep2.pdf']
+CHEVROLET_CATALOGS = ['chevrolet_pdfs/2023carros.pdf']
+# Number of get_column_value calls in the lookup mix.
+LOOKUPS = 2000
+
+
+# Function that runs a stage several times and returns its statistics.
+# run: Function that runs the stage once and returns its result.
+def time_stage(run: Callable[[], Any], repeat: int, pages: int) -> Dict[str, Any]:
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = perf_counter()
+        result = run()
+        times.append(perf_counter() - start)
+    seconds = median(times)
+    tracemalloc.start()
+    run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'seconds': seconds, 'pages_per_second': pages / seconds if seconds > 0 else None,
+            'peak_memory_mb': peak / (1024 * 1024), 'result': result}
+
+
+# Function that benchmarks the stages of the JeepPDFReader on a catalog.
+def benchmark_jeep(path: str, repeat: int) -> Dict[str, Dict[str, Any]]:
+    from JeepPDFReader import JeepPDFReader, extract_page_lines
+
+    def open_pdf() -> int:
+        with pdfplumber.open(path) as pdf:
+            return len(pdf.pages)
+
+    def extract() -> List[List[str]]:
+        with pdfplumber.open(path) as pdf:
+            return [extract_page_lines(page) for page in pdf.pages]
+
+    def read_cars_table(reader: JeepPDFReader) -> int:
+        reader._reset_parse_state()
+        for lines in pages_lines:
+            for _ in reader._read_cars_table(lines):
+                pass
+        return len(reader._cars)
+
+    # Only the state of the car details stage is reset, since _reset_parse_state also removes the cars read.
+    def fill_cars_data(reader: JeepPDFReader) -> int:
+        car_names = reader._car_names
+        reader._current_car_index = 0
+        reader._reading_car = False
+        for lines in pages_lines:
+            for _ in reader._fill_cars_data(lines):
+                pass
+        return len(car_names)
+
+    pages = open_pdf()
+    stages = {'open': time_stage(open_pdf, repeat, pages)}
+    stages['extraction'] = time_stage(extract, repeat, pages)
+    pages_lines = stages['extraction']['result']
+    reader = JeepPDFReader(file_path=path, stream=True)
+    stages['build_cars_dict'] = time_stage(lambda: read_cars_table(reader), repeat, pages)
+    stages['fill_cars_data'] = time_stage(lambda: fill_cars_data(reader), repeat, pages)
+    return stages
+
+
+# Function that builds a deterministic mix of get_column_value lookups for the tables of a reader.
+# It has exact names, differently cased names, misspelled names and indexes, with repeated queries.
+def build_lookup_mix(tables_by_group: Dict[str, list]) -> List[tuple]:
+    generator = random.Random(0)
+    queries = []
+    for table_group, tables in tables_by_group.items():
+        for table_index, table in enumerate(tables):
+            columns = [str(column) for column in table.columns]
+            lines = [str(value) for value in table.iloc[:, 0]]
+            for _ in range(20):
+                column = generator.choice(columns)
+                line = generator.choice(lines)
+                variant = generator.randrange(4)
+                if variant == 1:
+                    column, line = column.upper(), line.lower()
+                elif variant == 2 and len(column) > 3 and len(line) > 3:
+                    column, line = column[:-1], line[1:]
+                elif variant == 3:
+                    column = generator.randrange(len(columns))
+                queries.append((table_group, table_index, column, (0, line)))
+    if not queries:
+        return []
+    return [generator.choice(queries) for _ in range(LOOKUPS)]
+
+
+# Function that benchmarks the stages of the ChevroletPDFReader on a catalog.
+def benchmark_chevrolet(path: str, repeat: int) -> Dict[str, Dict[str, Any]]:
+    import tabula
+    from ChevroletPDFReader import ChevroletPDFReader
+
+    def open_pdf() -> int:
+        with pdfplumber.open(path) as pdf:
+            return len(pdf.pages)
+
+    def extract() -> list:
+        return tabula.read_pdf(path, pages='all', lattice=True, multiple_tables=True, encoding='ANSI')
+
+    def initial_setup(reader: ChevroletPDFReader) -> int:
+        reader._initial_setup([dataframe.copy() for dataframe in dataframes])
+        return sum(len(tables) for tables in reader._tables_by_group.values())
+
+    def lookups(reader: ChevroletPDFReader) -> int:
+        reader._clear_cell_cache()
+        for query in lookup_mix:
+            reader.get_column_value(*query)
+        return len(lookup_mix)
+
+    pages = open_pdf()
+    stages = {'open': time_stage(open_pdf, repeat, pages)}
+    stages['extraction'] = time_stage(extract, repeat, pages)
+    dataframes = stages['extraction']['result']
+    stages['extraction']['result'] = len(dataframes)
+    reader = ChevroletPDFReader(path)
+    stages['initial_setup'] = time_stage(lambda: initial_setup(reader), repeat, pages)
+    lookup_mix = build_lookup_mix(reader._tables_by_group)
+    stages['get_column_value'] = time_stage(lambda: lookups(reader), repeat, pages)
+    stages['get_column_value']['lookups_per_second'] = len(lookup_mix) / stages['get_column_value']['seconds'] \
+        if stages['get_column_value']['seconds'] > 0 else None
+    return stages
+
+
+# Function that benchmarks a catalog, catching any error so that the other catalogs are still benchmarked.
+# It is run in a fresh process for every catalog, so that the catalogs don't share caches or memory.
+def benchmark_catalog(reader: str, path: str, repeat: int) -> Dict[str, Any]:
+    benchmark = benchmark_jeep if reader == 'jeep' else benchmark_chevrolet
+    try:
+        stages = benchmark(path, repeat)
+        for statistics in stages.values():
+            statistics.pop('result', None)
+    except Exception as error:
+        return {'reader': reader, 'error': f'{type(error).__name__}: {error}', 'stages': {}}
+    return {'reader': reader, 'error': '', 'stages': stages}
+
+
+# Function that compares two runs and returns the regressions found.
+# A stage regressed if it became slower than the previous run by more than the threshold (e.g. 0.2 is 20%).
+def find_regressions(previous: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    regressions = []
+    for path, result in current['catalogs'].items():
+        previous_result = previous.get('catalogs', {}).get(path)
+        if previous_result is None:
+            continue
+        for stage, statistics in result['stages'].items():
+            previous_statistics = previous_result['stages'].get(stage)
+            if previous_statistics is None or previous_statistics['seconds'] <= 0:
+                continue
+            change = statistics['seconds'] / previous_statistics['seconds'] - 1
+            if change > threshold:
+                regressions.append(f'{path} {stage}: {previous_statistics["seconds"] * 1000:.2f} ms -> '
+                                   f'{statistics["seconds"] * 1000:.2f} ms (+{change:.0%})')
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the PDF readers over the bundled catalogs.')
+    parser.add_argument('--output', '-o', default='benchmark_results.json', help='Output JSON file.')
+    parser.add_argument('--repeat', '-r', type=int, default=5, help='Runs per stage (the median is kept).')
+    parser.add_argument('--compare', default='', help='Previous results JSON file to compare with.')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Slowdown over the previous run flagged as a regression (default: 0.2, 20%%).')
+    arguments = parser.parse_args()
+    catalogs = [('jeep', path) for path in JEEP_CATALOGS] + [('chevrolet', path) for path in CHEVROLET_CATALOGS]
+    results = {'timestamp': strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+               'platform': platform.platform(), 'repeat': arguments.repeat, 'catalogs': {}}
+    for reader, path in catalogs:
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+            result = executor.submit(benchmark_catalog, reader, path, arguments.repeat).result()
+        results['catalogs'][path] = result
+        if result['error'] != '':
+            print(f'{path}: FAILED ({result["error"]})')
+            continue
+        for stage, statistics in result['stages'].items():
+            print(f'{path} {stage}: {statistics["seconds"] * 1000:.2f} ms, '
+                  f'{statistics["pages_per_second"] or 0:.1f} pages/s, '
+                  f'peak memory {statistics["peak_memory_mb"]:.1f} MB')
+    with open(arguments.output, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=2)
+    print(f'Results saved to {arguments.output}')
+    if arguments.compare != '':
+        with open(arguments.compare, encoding='utf-8') as file:
+            previous = json.load(file)
+        regressions = find_regressions(previous, results, arguments.threshold)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
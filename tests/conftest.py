@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The readers are top-level modules of the repository root, and the tests read the bundled catalogs by relative path.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
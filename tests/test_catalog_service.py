@@ -0,0 +1,80 @@
+import asyncio
+import json
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from CatalogService import CatalogService
+
+
+# Executor whose workers always crash, like a process pool after a worker was killed.
+class BrokenExecutorStub(Executor):
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_exception(BrokenProcessPool('A worker process terminated abruptly.'))
+        return future
+
+
+# Function that sends a request to the service and returns (status, JSON body).
+# content_length (optional): Value of the Content-Length header, the length of the body if not given.
+async def post(service: CatalogService, target: str, body: bytes, content_length: str = None):
+    server = await asyncio.start_server(service.handle_connection, '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        stream_reader, stream_writer = await asyncio.open_connection('127.0.0.1', port)
+        if content_length is None:
+            content_length = str(len(body))
+        stream_writer.write(f'POST {target} HTTP/1.1\r\nContent-Length: {content_length}\r\n\r\n'.encode('latin-1') +
+                            body)
+        await stream_writer.drain()
+        response = await stream_reader.read()
+        stream_writer.close()
+    head, _, payload = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(payload)
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        yield executor
+
+
+def test_parse_catalog(executor):
+    with open('jeep_pdfs/jeep.pdf', 'rb') as file:
+        pdf = file.read()
+    status, body = asyncio.run(post(CatalogService(executor), '/parse?reader=jeep', pdf))
+    assert status == 200
+    assert len(body['cars']) == 4
+
+
+def test_parse_error_is_422(executor):
+    status, body = asyncio.run(post(CatalogService(executor), '/parse?reader=jeep', b'not a pdf'))
+    assert status == 422
+    assert body['error'] != ''
+
+
+@pytest.mark.parametrize('target, status', [('/other', 404), ('/parse?reader=ford', 400)])
+def test_bad_requests(executor, target, status):
+    assert asyncio.run(post(CatalogService(executor), target, b''))[0] == status
+
+
+@pytest.mark.parametrize('content_length', ['-1', 'abc'])
+def test_bad_content_length_is_400(executor, content_length):
+    status, body = asyncio.run(post(CatalogService(executor), '/parse?reader=jeep', b'', content_length))
+    assert status == 400
+    assert body['error'] == 'Malformed Content-Length header.'
+
+
+def test_broken_executor_is_500_and_replaced(executor):
+    service = CatalogService(BrokenExecutorStub(), executor_factory=lambda: executor)
+    status, body = asyncio.run(post(service, '/parse?reader=jeep', b'not a pdf'))
+    assert status == 500
+    assert service.get_executor() is executor
+    # The next request runs on the new executor.
+    assert asyncio.run(post(service, '/parse?reader=jeep', b'not a pdf'))[0] == 422
+
+
+def test_broken_executor_without_factory_is_500():
+    service = CatalogService(BrokenExecutorStub())
+    assert asyncio.run(post(service, '/parse?reader=jeep', b'not a pdf'))[0] == 500
@@ -0,0 +1,229 @@
+import gc
+import weakref
+
+import numpy
+import pypdfium2
+import pytest
+import tabula
+import tabula.io
+from pandas import DataFrame
+from tabula.backend import TabulaVm
+
+import ChevroletPDFReader as chevrolet_module
+from ChevroletPDFReader import ChevroletPDFReader, ChevroletPDFReaderSession
+from PDFParseCache import PDFParseCache
+
+
+# Tables shaped like the ones tabula-py extracts from a catalog in lattice mode, with NaN in the empty cells.
+def make_tables():
+    return [
+        DataFrame({'Marca/Modelo': ['149038', numpy.nan], 'Versão': ['LT', 'Premier'], 'Unnamed: 0': [None, None]}),
+        DataFrame({'Opcional': ['Brake Light', 'Airbag', None], 'LT Turbo 116cv': ['X', numpy.nan, 'X'],
+                   'Premier 116cv': ['X', 'X', numpy.nan]}),
+    ]
+
+
+@pytest.fixture
+def stub_tabula(monkeypatch):
+    def read_pdf(*args, **kwargs):
+        return make_tables()
+    monkeypatch.setattr(tabula, 'read_pdf', read_pdf)
+
+
+def test_tables_with_empty_cells(stub_tabula):
+    reader = ChevroletPDFReader('catalog.pdf')
+    assert reader.get_column_value(ChevroletPDFReader.INTRODUCTION_GROUP, 0, 'Marca/Modelo', 1) == ''
+    assert reader.get_column_value(ChevroletPDFReader.INTRODUCTION_GROUP, 0, 'Versão', (0, '149038')) == 'LT'
+    assert reader.get_column_value(ChevroletPDFReader.CONFIGURATION_GROUP, 0, 'LT Turbo 116cv', (0, 'Airbag')) == ''
+    assert reader.get_column_value(ChevroletPDFReader.CONFIGURATION_GROUP, 0, 'Premier 116cv',
+                                   (0, 'Brake Light')) == 'X'
+    assert list(reader.get_tables()[ChevroletPDFReader.INTRODUCTION_GROUP][0].columns) == ['Marca/Modelo', 'Versão']
+
+
+def test_tables_are_categorical(stub_tabula):
+    table = ChevroletPDFReader('catalog.pdf').get_tables()[ChevroletPDFReader.CONFIGURATION_GROUP][0]
+    assert all(str(dtype) == 'category' for dtype in table.dtypes)
+    assert table.values.tolist() == [['Brake Light', 'X', 'X'], ['Airbag', '', 'X'], ['', 'X', '']]
+    with pytest.raises(TypeError):
+        table.iloc[0, 1] = 'Opcional'
+
+
+
+def test_column_values(stub_tabula):
+    reader = ChevroletPDFReader('catalog.pdf')
+    columns = ['Opcional', 2, None, 'Premier 116cv']
+    lines = [(0, 'Airbag'), 0, (0, 'Xyzw'), 5, [0, 'Airbag'], (0, 'Brake Light')]
+    values = reader.get_column_values(ChevroletPDFReader.CONFIGURATION_GROUP, 0, columns, lines)
+    assert list(values.columns) == columns
+    assert list(values.index) == ['Airbag', 0, 'Xyzw', 5, [0, 'Airbag'], 'Brake Light']
+    assert values.values.tolist() == [
+        ['Airbag', 'X', '', 'X'],
+        ['Brake Light', 'X', '', 'X'],
+        ['', '', '', ''],
+        ['', '', '', ''],
+        ['', '', '', ''],
+        ['Brake Light', 'X', '', 'X'],
+    ]
+    # Each cell matches the single lookup.
+    for line_position, line in enumerate(lines):
+        for column_position, column in enumerate(columns):
+            assert values.iloc[line_position, column_position] == reader.get_column_value(
+                ChevroletPDFReader.CONFIGURATION_GROUP, 0, column, line)
+    assert reader.get_column_values(ChevroletPDFReader.CONFIGURATION_GROUP, 0, [None], [0]).values.tolist() == [['']]
+    assert reader.get_column_values(ChevroletPDFReader.CONFIGURATION_GROUP, 5, [0], [0]).empty
+
+def test_session_warns_without_jpype(monkeypatch):
+    monkeypatch.setattr(chevrolet_module, 'find_spec', lambda name: None)
+    with pytest.warns(RuntimeWarning, match='JPype'):
+        session = ChevroletPDFReaderSession()
+    assert not session.reuses_java_vm()
+
+
+def test_session_in_subprocess_mode_does_not_warn(monkeypatch, recwarn):
+    monkeypatch.setattr(chevrolet_module, 'find_spec', lambda name: None)
+    session = ChevroletPDFReaderSession(force_subprocess=True)
+    assert not session.reuses_java_vm()
+    assert not [warning for warning in recwarn if warning.category is RuntimeWarning]
+
+
+def test_tables_are_loaded_from_the_parse_cache(stub_tabula, monkeypatch, tmp_path):
+    pdf_path = tmp_path / 'catalog.pdf'
+    pdf_path.write_bytes(b'%PDF-1.4')
+    parse_cache = PDFParseCache(str(tmp_path / 'cache'))
+    tables = ChevroletPDFReader(str(pdf_path), parse_cache=parse_cache).get_tables()
+    monkeypatch.setattr(tabula, 'read_pdf', None)
+    cached_tables = ChevroletPDFReader(str(pdf_path), parse_cache=parse_cache).get_tables()
+    assert all(table.equals(cached_table) for table_group in tables
+               for table, cached_table in zip(tables[table_group], cached_tables[table_group]))
+
+
+# Tables of each page of a catalog (pages start at 1), as tabula-py would extract them.
+def make_page_tables():
+    return {
+        1: [DataFrame({'Marca/Modelo': ['149038'], 'Versão': ['LT']})],
+        2: [DataFrame({'Especificações Técnicas': ['Potência', '116cv']}),
+            DataFrame({'Opcional': ['Airbag'], 'LT': ['X'], 'Premier': ['X']})],
+        3: [DataFrame({'Opcional': ['Brake Light'], 'LT': [numpy.nan], 'Premier': ['X']})],
+        4: [DataFrame({'Acessório': ['Tapete'], 'Código': ['123']})],
+        5: [DataFrame({'Especificações Técnicas': ['Torque', '16kgfm']})],
+    }
+
+
+@pytest.fixture
+def paged_catalog(monkeypatch, tmp_path):
+    page_tables = make_page_tables()
+    extracted_pages = []
+
+    def read_pdf(pdf, pages='all', **kwargs):
+        pages = sorted(page_tables) if pages == 'all' else pages
+        extracted_pages.extend(pages)
+        return [table.copy() for page in pages for table in page_tables[page]]
+    monkeypatch.setattr(tabula, 'read_pdf', read_pdf)
+    document = pypdfium2.PdfDocument.new()
+    for _ in page_tables:
+        document.new_page(595, 842)
+    pdf_path = str(tmp_path / 'catalog.pdf')
+    document.save(pdf_path)
+    return pdf_path, extracted_pages
+
+
+def assert_same_tables(tables, expected_tables):
+    assert tables.keys() == expected_tables.keys()
+    for table_group in expected_tables:
+        assert len(tables[table_group]) == len(expected_tables[table_group])
+        for table, expected_table in zip(tables[table_group], expected_tables[table_group]):
+            assert table.equals(expected_table)
+
+
+@pytest.mark.parametrize('access_order', [
+    [ChevroletPDFReader.INTRODUCTION_GROUP],
+    [ChevroletPDFReader.CONFIGURATION_GROUP, ChevroletPDFReader.INTRODUCTION_GROUP],
+    [ChevroletPDFReader.SPECIFICATION_GROUP],
+    [ChevroletPDFReader.CONFIGURATION_GROUP_2, ChevroletPDFReader.SPECIFICATION_GROUP],
+])
+def test_lazy_mode_matches_eager_mode(paged_catalog, access_order):
+    pdf_path, _ = paged_catalog
+    eager_reader = ChevroletPDFReader(pdf_path)
+    lazy_reader = ChevroletPDFReader(pdf_path, lazy=True)
+    for table_group in access_order:
+        for table_index in range(3):
+            assert lazy_reader.get_column_value(table_group, table_index, 0, 1) == \
+                eager_reader.get_column_value(table_group, table_index, 0, 1)
+    assert_same_tables(lazy_reader.get_tables(), eager_reader.get_tables())
+
+
+def test_lazy_mode_only_extracts_the_pages_needed(paged_catalog):
+    pdf_path, extracted_pages = paged_catalog
+    reader = ChevroletPDFReader(pdf_path, lazy=True)
+    assert extracted_pages == []
+    assert reader.get_column_value(ChevroletPDFReader.INTRODUCTION_GROUP, 0, 'Versão', 0) == 'LT'
+    # The Introduction group is complete once a table of the next group is found.
+    assert extracted_pages == [1, 2]
+
+
+def test_lazy_mode_with_wrong_page_guesses(paged_catalog):
+    pdf_path, _ = paged_catalog
+    eager_reader = ChevroletPDFReader(pdf_path)
+    lazy_reader = ChevroletPDFReader(pdf_path, lazy=True)
+    lazy_reader._pages_by_group = {ChevroletPDFReader.INTRODUCTION_GROUP: [4],
+                                   ChevroletPDFReader.CONFIGURATION_GROUP: [1]}
+    assert lazy_reader.get_column_value(ChevroletPDFReader.CONFIGURATION_GROUP, 1, 'LT', 0) == ''
+    assert_same_tables(lazy_reader.get_tables(), eager_reader.get_tables())
+
+
+def test_session_warns_when_tabula_runs_in_subprocess_mode(stub_tabula, monkeypatch):
+    monkeypatch.setattr(chevrolet_module, 'find_spec', lambda name: object())
+    session = ChevroletPDFReaderSession()
+    assert session.reuses_java_vm()
+    # The backend left by an earlier read with force_subprocess=True.
+    monkeypatch.setattr(tabula.io, '_tabula_vm', object())
+    with pytest.warns(RuntimeWarning, match='subprocess mode'):
+        session.read('catalog.pdf')
+    assert not session.reuses_java_vm()
+
+
+def test_session_with_in_process_backend(stub_tabula, monkeypatch, recwarn):
+    monkeypatch.setattr(chevrolet_module, 'find_spec', lambda name: object())
+    monkeypatch.setattr(tabula.io, '_tabula_vm', TabulaVm.__new__(TabulaVm))
+    session = ChevroletPDFReaderSession()
+    session.read_all(['catalog.pdf', 'catalog.pdf'])
+    assert session.reuses_java_vm()
+    assert not [warning for warning in recwarn if warning.category is RuntimeWarning]
+
+
+def test_lookup_cache(stub_tabula):
+    reader = ChevroletPDFReader('catalog.pdf', cache_size=2)
+    query = (ChevroletPDFReader.CONFIGURATION_GROUP, 0, 'Premier 116cv', (0, 'Brake Light'))
+    assert reader.get_column_value(*query) == 'X'
+    assert reader.get_column_value(*query) == 'X'
+    assert reader.get_cache_info() == {'hits': 1, 'misses': 1, 'size': 1, 'max_size': 2}
+    reader.get_column_value(ChevroletPDFReader.CONFIGURATION_GROUP, 0, 0, 1)
+    reader.get_column_value(ChevroletPDFReader.CONFIGURATION_GROUP, 0, 0, 2)
+    assert reader.get_cache_info()['size'] == 2
+    # The least recently used query was evicted.
+    reader.get_column_value(*query)
+    assert reader.get_cache_info()['misses'] == 4
+
+
+def test_lookup_cache_is_cleared_with_the_tables(stub_tabula):
+    reader = ChevroletPDFReader('catalog.pdf')
+    query = (ChevroletPDFReader.CONFIGURATION_GROUP, 0, 'Premier 116cv', (0, 'Airbag'))
+    assert reader.get_column_value(*query) == 'X'
+    tables = make_tables()
+    tables[1] = tables[1].iloc[::-1].reset_index(drop=True)
+    reader._initial_setup(tables)
+    assert reader.get_cache_info()['size'] == 0
+    assert reader.get_column_value(*query) == 'X'
+    assert reader.get_column_value(ChevroletPDFReader.CONFIGURATION_GROUP, 0, 'Opcional', 1) == 'Airbag'
+
+
+def test_reader_is_freed_without_the_cyclic_garbage_collector(stub_tabula):
+    reader = ChevroletPDFReader('catalog.pdf')
+    reader.get_column_value(ChevroletPDFReader.CONFIGURATION_GROUP, 0, 0, 0)
+    reference = weakref.ref(reader)
+    gc.disable()
+    try:
+        del reader
+        assert reference() is None
+    finally:
+        gc.enable()
@@ -0,0 +1,27 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import pytest
+
+from benchmarks import jeep_low_memory
+from benchmarks.jeep_low_memory import concatenate_copies, parse_peak_rss_mb
+
+# Allowed peak RSS growth, in MB, from 1 to 8 copies of jeep.pdf in low memory mode.
+# Keeping the layout objects of every page alive costs about 40 MB per copy.
+MAX_GROWTH_MB = 32
+
+
+# Function that parses a catalog in a fresh process and returns its peak RSS, in MB.
+def peak_rss_in_fresh_process(path: str) -> float:
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as executor:
+        return executor.submit(parse_peak_rss_mb, path, True).result()
+
+
+@pytest.mark.skipif(jeep_low_memory.resource is None, reason='The peak RSS can only be read on POSIX systems.')
+def test_low_memory_peak_rss_is_flat(tmp_path):
+    paths = []
+    for copies in (1, 8):
+        paths.append(str(tmp_path / f'jeep_x{copies}.pdf'))
+        concatenate_copies('jeep_pdfs/jeep.pdf', copies, paths[-1])
+    single_copy_peak, multiple_copies_peak = [peak_rss_in_fresh_process(path) for path in paths]
+    assert multiple_copies_peak - single_copy_peak < MAX_GROWTH_MB
@@ -0,0 +1,193 @@
+import copy
+from io import BytesIO
+
+import pdfplumber
+import pypdfium2
+import pytest
+
+from JeepPDFReader import (CAR_EVENT, COLUMN_NAMES_STRING_MATCH, TABLE_FOOTER_STRING_MATCH, UPDATE_EVENT,
+                           JeepPDFReader, LineMatcher, diff_cars, extract_page_lines, is_similar, page_fingerprint,
+                           parse_potencia, parse_preco)
+from PDFParseCache import PDFParseCache
+
+JEEP_CATALOGS = ['jeep_pdfs/jeep.pdf', 'jeep_pdfs/jeep2.pdf']
+
+
+@pytest.mark.parametrize('path', JEEP_CATALOGS)
+def test_parallel_extraction_matches_serial(path):
+    serial = JeepPDFReader(file_path=path)
+    parallel = JeepPDFReader(file_path=path, workers=2)
+    assert serial.get_cars() != {}
+    assert parallel.get_cars() == serial.get_cars()
+    assert parallel.get_pages_extracted() == serial.get_pages_extracted()
+
+
+
+@pytest.mark.parametrize('path', JEEP_CATALOGS)
+def test_line_matcher_matches_is_similar(path):
+    with pdfplumber.open(path) as pdf:
+        lines = [line for page in pdf.pages for line in extract_page_lines(page)]
+    for pattern in (COLUMN_NAMES_STRING_MATCH, TABLE_FOOTER_STRING_MATCH):
+        # Truncated copies of the pattern are close to the ratio, on both sides.
+        candidates = lines + [pattern[:length] for length in range(len(pattern) // 2, len(pattern) + 1)]
+        matcher = LineMatcher(pattern)
+        assert [matcher.is_similar(line) for line in candidates] == [is_similar(line, pattern) for line in candidates]
+        assert any(matcher.is_similar(line) for line in lines)
+
+def test_potencia_without_cv_suffix():
+    cars = JeepPDFReader(file_path='jeep_pdfs/jeep2.pdf').get_cars()
+    assert {car['potencia'] for car in cars.values()} == {'185cv', '170cv'}
+
+
+def test_parallel_extraction_of_empty_pdf():
+    document = pypdfium2.PdfDocument.new()
+    pdf_bytes = BytesIO()
+    document.save(pdf_bytes)
+    reader = JeepPDFReader(pdf_bytes=BytesIO(pdf_bytes.getvalue()), workers=2)
+    assert reader.get_cars() == {}
+    assert reader.get_pages_extracted() == 0
+
+
+# Function that builds a one-page PDF file whose text is drawn by a Form XObject, so the page content stream is the
+# same for any text.
+def make_form_pdf(text: str) -> bytes:
+    form = f'BT /F1 12 Tf 72 720 Td ({text}) Tj ET'.encode('latin-1')
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents 4 0 R '
+        b'/Resources << /XObject << /Fm1 5 0 R >> >> >>',
+        b'<< /Length 8 >>\nstream\n/Fm1 Do\nendstream',
+        b'<< /Type /XObject /Subtype /Form /BBox [0 0 595 842] /Resources << /Font << /F1 6 0 R >> >> '
+        b'/Length %d >>\nstream\n' % len(form) + form + b'\nendstream',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    pdf = BytesIO()
+    pdf.write(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(pdf.tell())
+        pdf.write(b'%d 0 obj\n' % number + body + b'\nendobj\n')
+    xref_offset = pdf.tell()
+    pdf.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+    for offset in offsets:
+        pdf.write(b'%010d 00000 n \n' % offset)
+    pdf.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref_offset))
+    return pdf.getvalue()
+
+
+def first_page_fingerprint(pdf: bytes) -> str:
+    with pdfplumber.open(BytesIO(pdf)) as document:
+        return page_fingerprint(document.pages[0])
+
+
+def test_page_cache_reuses_unchanged_pages():
+    page_cache = {}
+    first = JeepPDFReader(file_path='jeep_pdfs/jeep.pdf', page_cache=page_cache)
+    second = JeepPDFReader(file_path='jeep_pdfs/jeep.pdf', page_cache=page_cache)
+    assert first.get_pages_extracted() == len(page_cache) == 9
+    assert second.get_pages_extracted() == 0
+    assert second.get_cars() == first.get_cars() == JeepPDFReader(file_path='jeep_pdfs/jeep.pdf').get_cars()
+
+
+def test_page_fingerprint_covers_form_xobjects():
+    assert first_page_fingerprint(make_form_pdf('Preco 100')) == first_page_fingerprint(make_form_pdf('Preco 100'))
+    assert first_page_fingerprint(make_form_pdf('Preco 100')) != first_page_fingerprint(make_form_pdf('Preco 200'))
+
+
+def test_page_fingerprint_covers_page_boxes():
+    with open('jeep_pdfs/jeep.pdf', 'rb') as file:
+        pdf = file.read()
+    document = pypdfium2.PdfDocument(pdf)
+    document[0].set_cropbox(0, 400, 595.28, 841.88)
+    cropped_pdf = BytesIO()
+    document.save(cropped_pdf)
+    assert first_page_fingerprint(pdf) != first_page_fingerprint(cropped_pdf.getvalue())
+
+
+def test_diff_cars():
+    old_cars = JeepPDFReader(file_path='jeep_pdfs/jeep.pdf').get_cars()
+    assert diff_cars(old_cars, old_cars) == {'added': [], 'removed': [], 'repriced': []}
+    new_cars = copy.deepcopy(old_cars)
+    repriced_name, removed_name = list(new_cars)[:2]
+    new_cars[repriced_name]['preco'] = '1.000,00'
+    removed_car = new_cars.pop(removed_name)
+    added_car = dict(removed_car, sigla='6719999', desc_cat='COMMANDER NEW')
+    new_cars['COMMANDER NEW'] = added_car
+    diff = diff_cars(old_cars, new_cars)
+    assert diff['added'] == [added_car]
+    assert diff['removed'] == [removed_car]
+    assert diff['repriced'] == [{'sigla': old_cars[repriced_name]['sigla'], 'ano': old_cars[repriced_name]['ano'],
+                                 'old_preco': old_cars[repriced_name]['preco'], 'new_preco': '1.000,00'}]
+
+
+def test_cars_view_is_live_and_read_only():
+    reader = JeepPDFReader(file_path='jeep_pdfs/jeep.pdf', stream=True)
+    view = reader.get_cars_view()
+    assert len(view) == 0
+    events = reader.iter_cars()
+    _, car_name, _ = next(event for event in events if event[0] == CAR_EVENT)
+    assert list(view) == [car_name]
+    for _ in events:
+        pass
+    assert dict(view.items()) == reader.get_cars()
+    with pytest.raises(TypeError):
+        view[car_name]['preco'] = '1,00'
+    with pytest.raises(TypeError):
+        view['other'] = {}
+
+
+
+def test_iter_cars_starts_over_after_a_partial_iteration():
+    expected_cars = JeepPDFReader(file_path='jeep_pdfs/jeep.pdf').get_cars()
+    reader = JeepPDFReader(file_path='jeep_pdfs/jeep.pdf', stream=True)
+    view = reader.get_cars_view()
+    partial = reader.iter_cars()
+    next(event for event in partial if event[0] == CAR_EVENT)
+    events = list(reader.iter_cars())
+    assert reader.get_cars() == expected_cars
+    assert dict(view.items()) == expected_cars
+    assert reader.get_metrics().cars == len(expected_cars)
+    assert all(car_data['potencia'] for car_data in reader.get_cars().values())
+    assert len([event for event in events if event[0] == UPDATE_EVENT]) == len(expected_cars)
+    # The parse that was started over can't be resumed.
+    with pytest.raises(RuntimeError):
+        list(partial)
+
+
+def test_iter_cars_uses_the_parse_cache(tmp_path):
+    cache = PDFParseCache(str(tmp_path))
+    reader = JeepPDFReader(file_path='jeep_pdfs/jeep.pdf', cache=cache, stream=True)
+    cars = {car_name: car_data for event, car_name, car_data in reader.iter_cars() if event == CAR_EVENT}
+    cached_reader = JeepPDFReader(file_path='jeep_pdfs/jeep.pdf', cache=cache, stream=True)
+    assert [event for event, _, _ in cached_reader.iter_cars()] == [CAR_EVENT] * len(cars)
+    assert cached_reader.get_cars() == reader.get_cars()
+    assert cached_reader.get_pages_extracted() == 0
+
+def test_parse_numeric_fields():
+    assert parse_preco('242.990,00') == 242990.0
+    assert parse_potencia('185cv') == 185
+    assert parse_potencia('170CV') == 170
+    assert parse_potencia('185') == 185
+    assert parse_potencia(None) is None
+
+
+def test_car_table_queries():
+    reader = JeepPDFReader(file_path='jeep_pdfs/jeep.pdf')
+    table = reader.get_car_table()
+    assert table is reader.get_car_table()
+    assert len(table) == 4
+    car = table.get('COMMANDER OVERLAND T270')
+    assert (car.sigla, car.ano, car.preco, car.potencia, car.pagina) == ('6711710', 2023, 269590.0, 185, 2)
+    assert sorted(table.values('combustivel')) == ['Diesel', 'Flex']
+    assert [car.name for car in table.filter(combustivel='flex')] == ['COMMANDER LIMITED T270',
+                                                                      'COMMANDER OVERLAND T270']
+    assert [car.name for car in table.filter(linha='Commander', min_preco=250000, max_preco=290000)] == \
+        ['COMMANDER OVERLAND T270', 'COMMANDER LIMITED TD380 4X4']
+    assert table.filter(ano=2024) == []
+    assert len(table.filter()) == 4
+
+
+def test_car_table_needs_a_parsed_pdf():
+    with pytest.raises(RuntimeError):
+        JeepPDFReader(file_path='jeep_pdfs/jeep.pdf', stream=True).get_car_table()
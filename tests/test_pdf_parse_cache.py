@@ -0,0 +1,56 @@
+import os
+from io import BytesIO
+
+import pytest
+
+from PDFParseCache import PDFParseCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return PDFParseCache(str(tmp_path))
+
+
+def entry_path(cache_directory, key):
+    return os.path.join(cache_directory, key + '.pickle')
+
+
+def test_put_and_get(cache):
+    key = PDFParseCache.make_key(BytesIO(b'%PDF-1.4'), 'Reader', 1, {'encoding': 'utf-8'})
+    assert cache.get(key) is None
+    cache.put(key, {'car': {'preco': '1,00'}})
+    assert cache.get(key) == {'car': {'preco': '1,00'}}
+
+
+def test_key_depends_on_content_reader_and_parameters():
+    key = PDFParseCache.make_key(BytesIO(b'%PDF-1.4'), 'Reader', 1, {'encoding': 'utf-8'})
+    assert key == PDFParseCache.make_key(BytesIO(b'%PDF-1.4'), 'Reader', 1, {'encoding': 'utf-8'})
+    assert key != PDFParseCache.make_key(BytesIO(b'%PDF-1.5'), 'Reader', 1, {'encoding': 'utf-8'})
+    assert key != PDFParseCache.make_key(BytesIO(b'%PDF-1.4'), 'Reader', 2, {'encoding': 'utf-8'})
+    assert key != PDFParseCache.make_key(BytesIO(b'%PDF-1.4'), 'Reader', 1, {'encoding': 'latin-1'})
+
+
+@pytest.mark.parametrize('contents', [
+    b'',
+    b'not a pickle',
+    # A pickle of a class from a module that doesn't exist anymore.
+    b'cmissing_module\nMissingClass\n)R.',
+    # A pickle of a class that doesn't accept its pickled arguments.
+    b'cbuiltins\nlen\n)R.',
+])
+def test_bad_entries_are_misses_and_removed(cache, tmp_path, contents):
+    key = PDFParseCache.make_key(BytesIO(b'%PDF-1.4'), 'Reader', 1)
+    with open(entry_path(str(tmp_path), key), 'wb') as file:
+        file.write(contents)
+    assert cache.get(key) is None
+    assert not os.path.exists(entry_path(str(tmp_path), key))
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = PDFParseCache(str(tmp_path), max_size_bytes=3000)
+    for index in range(3):
+        cache.put(f'key{index}', b'x' * 1000)
+        os.utime(entry_path(str(tmp_path), f'key{index}'), (index, index))
+    cache.put('key3', b'x' * 1000)
+    assert cache.get('key0') is None
+    assert cache.get('key3') == b'x' * 1000